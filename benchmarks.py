@@ -0,0 +1,317 @@
+"""Benchmarks for the Vector, Line and Plane hot paths.
+
+Every benchmark runs a batch of operations on freshly built objects, so
+cached magnitudes and unit vectors from an earlier repeat do not count,
+and reports the best throughput in operations per second over several
+repeats. Results can be saved as a JSON baseline and later runs compared
+against it:
+
+    python benchmarks.py --save-baseline bench_baseline.json
+    python benchmarks.py --baseline bench_baseline.json --threshold 0.2
+
+The second command exits with status 1 if any benchmark's throughput fell
+by more than 20% against the baseline.
+
+The time to import the linear_algebra package is measured in fresh
+interpreters as well, reported as imports per second so it is compared
+against the baseline like the other results. The run also fails if the
+import takes longer than --startup-budget seconds or loads numpy or
+multiprocessing, which the package only imports on first use.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from timeit import default_timer
+
+from numeric_backends import use_backend
+from vectors_final import Vector
+from line_intersections import Line
+from planes import Plane
+
+DEFAULT_DIMENSIONS = (3, 10, 100)
+DEFAULT_BATCH_SIZES = (100, 1000)
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.2
+
+STARTUP_MODULE = 'linear_algebra'
+# seconds; importing numpy alone takes longer than this
+STARTUP_BUDGET = 0.05
+HEAVY_MODULES = ('numpy', 'multiprocessing')
+
+_STARTUP_SCRIPT = """
+import json, sys
+from timeit import default_timer
+start = default_timer()
+import {module}
+elapsed = default_timer() - start
+print(json.dumps([elapsed, [m for m in {heavy!r} if m in sys.modules]]))
+"""
+
+BENCHMARKS = []
+
+
+def benchmark(name, dimensions=None):
+    """Registers a benchmark. The decorated function takes (dimension,
+    batch_size, rng) and returns (data, run); run(data) performs batch_size
+    operations. dimensions pins the benchmark to fixed dimensions"""
+
+    def register(prepare):
+        BENCHMARKS.append((name, dimensions, prepare))
+        return prepare
+    return register
+
+
+def _random_coordinates(dimension, rng):
+    return [rng.uniform(-10, 10) for _ in range(dimension)]
+
+
+def _random_vectors(dimension, count, rng):
+    return [Vector(_random_coordinates(dimension, rng)) for _ in range(count)]
+
+
+@benchmark('vector_construction')
+def bench_vector_construction(dimension, batch_size, rng):
+    rows = [_random_coordinates(dimension, rng) for _ in range(batch_size)]
+
+    def run(rows):
+        for row in rows:
+            Vector(row)
+    return rows, run
+
+
+@benchmark('find_dot_product')
+def bench_dot_product(dimension, batch_size, rng):
+    pairs = list(zip(_random_vectors(dimension, batch_size, rng),
+                     _random_vectors(dimension, batch_size, rng)))
+
+    def run(pairs):
+        for v, w in pairs:
+            v.find_dot_product(w)
+    return pairs, run
+
+
+@benchmark('find_normalization_vector')
+def bench_normalization(dimension, batch_size, rng):
+    vectors = _random_vectors(dimension, batch_size, rng)
+
+    def run(vectors):
+        for v in vectors:
+            v.find_normalization_vector()
+    return vectors, run
+
+
+@benchmark('find_vectors_angle')
+def bench_angle(dimension, batch_size, rng):
+    pairs = list(zip(_random_vectors(dimension, batch_size, rng),
+                     _random_vectors(dimension, batch_size, rng)))
+
+    def run(pairs):
+        for v, w in pairs:
+            v.find_vectors_angle(w)
+    return pairs, run
+
+
+@benchmark('find_cross_product_of', dimensions=(3,))
+def bench_cross_product(dimension, batch_size, rng):
+    pairs = list(zip(_random_vectors(dimension, batch_size, rng),
+                     _random_vectors(dimension, batch_size, rng)))
+
+    def run(pairs):
+        for v, w in pairs:
+            v.find_cross_product_of(w)
+    return pairs, run
+
+
+@benchmark('line_construction', dimensions=(2,))
+def bench_line_construction(dimension, batch_size, rng):
+    rows = [(Vector(_random_coordinates(2, rng)), rng.uniform(-10, 10))
+            for _ in range(batch_size)]
+
+    def run(rows):
+        for normal, constant in rows:
+            Line(normal, constant)
+    return rows, run
+
+
+@benchmark('line_intersection_with', dimensions=(2,))
+def bench_line_intersection(dimension, batch_size, rng):
+    pairs = [(Line(Vector(_random_coordinates(2, rng)), rng.uniform(-10, 10)),
+              Line(Vector(_random_coordinates(2, rng)), rng.uniform(-10, 10)))
+             for _ in range(batch_size)]
+
+    def run(pairs):
+        for l1, l2 in pairs:
+            l1.intersection_with(l2)
+    return pairs, run
+
+
+@benchmark('plane_construction', dimensions=(3,))
+def bench_plane_construction(dimension, batch_size, rng):
+    rows = [(Vector(_random_coordinates(3, rng)), rng.uniform(-10, 10))
+            for _ in range(batch_size)]
+
+    def run(rows):
+        for normal, constant in rows:
+            Plane(normal, constant)
+    return rows, run
+
+
+@benchmark('plane_eq', dimensions=(3,))
+def bench_plane_eq(dimension, batch_size, rng):
+    pairs = []
+    for i in range(batch_size):
+        normal = _random_coordinates(3, rng)
+        constant = rng.uniform(-10, 10)
+        p1 = Plane(Vector(normal), constant)
+        if i % 2:
+            # half the pairs are the same plane scaled, the slow path
+            p2 = Plane(Vector([2 * x for x in normal]), 2 * constant)
+        else:
+            p2 = Plane(Vector(_random_coordinates(3, rng)), constant)
+        pairs.append((p1, p2))
+
+    def run(pairs):
+        for p1, p2 in pairs:
+            p1 == p2
+    return pairs, run
+
+
+def run_benchmarks(dimensions=DEFAULT_DIMENSIONS, batch_sizes=DEFAULT_BATCH_SIZES,
+                   repeat=DEFAULT_REPEAT, backend='decimal', only=None, seed=0):
+    """Runs the registered benchmarks and returns {key: operations per second}.
+
+    Keys look like 'find_dot_product[decimal,d=10,n=1000]'. Data is built
+    again before every repeat and is not included in the timing."""
+
+    results = {}
+    with use_backend(backend):
+        for name, fixed_dimensions, prepare in BENCHMARKS:
+            if only and only not in name:
+                continue
+            for dimension in fixed_dimensions or dimensions:
+                for batch_size in batch_sizes:
+                    best = None
+                    for i in range(repeat):
+                        rng = random.Random(seed + i)
+                        data, run = prepare(dimension, batch_size, rng)
+                        start = default_timer()
+                        run(data)
+                        elapsed = default_timer() - start
+                        if best is None or elapsed < best:
+                            best = elapsed
+
+                    key = '{}[{},d={},n={}]'.format(name, backend, dimension, batch_size)
+                    results[key] = batch_size / max(best, 1e-9)
+    return results
+
+
+def measure_startup(module=STARTUP_MODULE, repeat=DEFAULT_REPEAT):
+    """Imports module in repeat fresh interpreters started in this
+    directory. Returns the shortest import time in seconds and the
+    HEAVY_MODULES the import loaded"""
+
+    script = _STARTUP_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+    directory = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    heavy = []
+    for i in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=directory)
+        elapsed, heavy = json.loads(output.decode('ascii'))
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, heavy
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Returns a list of (key, baseline ops/s, current ops/s) for every
+    benchmark whose throughput dropped by more than threshold"""
+
+    regressions = []
+    for key, baseline_throughput in sorted(baseline.items()):
+        if key not in results:
+            continue
+        if results[key] < baseline_throughput * (1 - threshold):
+            regressions.append((key, baseline_throughput, results[key]))
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path, results):
+    document = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+
+def _int_list(text):
+    return tuple(int(x) for x in text.split(','))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--dimensions', type=_int_list, default=DEFAULT_DIMENSIONS,
+                        help='comma separated vector dimensions to sweep')
+    parser.add_argument('--batch-sizes', type=_int_list, default=DEFAULT_BATCH_SIZES,
+                        help='comma separated numbers of operations per run')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--backend', default='decimal',
+                        choices=('decimal', 'float', 'fraction'))
+    parser.add_argument('--only', help='only run benchmarks whose name contains this')
+    parser.add_argument('--save-baseline', metavar='PATH',
+                        help='write the results to a JSON baseline')
+    parser.add_argument('--baseline', metavar='PATH',
+                        help='compare against a JSON baseline and fail on regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed relative throughput drop, 0.2 means 20%%')
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET,
+                        help='allowed seconds to import the package')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.dimensions, args.batch_sizes, args.repeat,
+                             args.backend, args.only)
+
+    startup = None
+    if not args.only or args.only in 'startup':
+        startup, heavy = measure_startup(repeat=args.repeat)
+        results['startup[{}]'.format(STARTUP_MODULE)] = 1.0 / max(startup, 1e-9)
+
+    baseline = load_baseline(args.baseline) if args.baseline else {}
+    for key in sorted(results):
+        line = '{:<55} {:>14,.0f} ops/s'.format(key, results[key])
+        if key in baseline:
+            line += '  {:+6.1f}%'.format(100.0 * (results[key] / baseline[key] - 1))
+        print(line)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for key, before, after in regressions:
+            print('REGRESSION {}: {:,.0f} -> {:,.0f} ops/s'.format(key, before, after))
+        if regressions:
+            return 1
+
+    if startup is not None and (startup > args.startup_budget or heavy):
+        print('OVER BUDGET import {}: {:.1f} ms (budget {:.1f} ms), loaded {}'.format(
+            STARTUP_MODULE, 1000 * startup, 1000 * args.startup_budget,
+            ', '.join(heavy) or 'no heavy modules'))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+from itertools import product
+from math import isinf, isnan
+
+# the tolerance of Vector.is_zero and is_near_zero
+DEFAULT_TOLERANCE = 1e-10
+
+
+def quantize(values, tolerance=DEFAULT_TOLERANCE):
+    """Snaps numbers of any backend to a grid of size tolerance and returns
+    the grid indices as a tuple of ints. Numbers too large for the grid,
+    infinities and NaN are kept as floats, so the result always hashes"""
+
+    return tuple([_grid_index(float(x), tolerance) for x in values])
+
+
+def _grid_index(x, tolerance):
+    scaled = x / tolerance
+    if isinf(scaled) or isnan(scaled):
+        return x
+    return int(round(scaled))
+
+
+def canonical_equation(normal, constant, tolerance=DEFAULT_TOLERANCE):
+    """Returns the equation n.x = k scaled to a unit normal whose first
+    nonzero coordinate is positive, as a tuple of floats (n..., k).
+
+    Equations of the same line or plane have the same canonical form, as in
+    plane_groups.canonicalize_planes. A normal within tolerance of zero is
+    left unscaled."""
+
+    normal = [float(x) for x in getattr(normal, 'coordinates', normal)]
+    constant = float(constant)
+
+    magnitude = sum(x * x for x in normal) ** 0.5
+    if isinf(magnitude):
+        # the squares overflowed; scale by the largest coordinate first
+        largest = max([abs(x) for x in normal])
+        if isinf(largest):
+            return tuple(normal) + (constant,)
+        magnitude = largest * sum((x / largest) ** 2 for x in normal) ** 0.5
+    if isnan(magnitude) or magnitude < tolerance:
+        return tuple(normal) + (constant,)
+
+    scale = 1.0 / magnitude
+    for x in normal:
+        if abs(x) * scale > tolerance:
+            if x < 0:
+                scale = -scale
+            break
+    return tuple([x * scale for x in normal]) + (constant * scale,)
+
+
+def canonical_form(item, tolerance=DEFAULT_TOLERANCE):
+    """Returns the coordinates of a Vector, or the canonical equation of a
+    Line or Plane, as a tuple of floats"""
+
+    if hasattr(item, 'coefficients'):
+        coefficients = item.coefficients
+        return canonical_equation(coefficients[:-1], coefficients[-1], tolerance)
+    if hasattr(item, 'normal_vector'):
+        return canonical_equation(item.normal_vector, item.constant_term,
+                                  tolerance)
+    return tuple([float(x) for x in getattr(item, 'coordinates', item)])
+
+
+def canonical_key(item, tolerance=DEFAULT_TOLERANCE):
+    """Returns the quantized canonical form of a Vector, Line or Plane; the
+    hash of a Vector is computed from it.
+
+    Items whose canonical forms agree within tolerance can still get
+    different keys when their values fall on either side of a grid line, so
+    Lines and Planes, which compare within a tolerance, are not hashable;
+    use unique_labels to deduplicate them."""
+
+    return quantize(canonical_form(item, tolerance), tolerance)
+
+
+def unique_labels(items, tolerance=DEFAULT_TOLERANCE):
+    """Labels Vectors, Lines or Planes so that items whose canonical forms
+    differ by at most tolerance in every coordinate get the label of the
+    first such item, in O(N) hash lookups.
+
+    Canonical forms are bucketed on a grid of size 2 * tolerance. A match
+    for a coordinate can only lie in its own cell or in the neighbouring
+    cell on the side of the nearer edge, so 2**d buckets are searched per
+    item instead of comparing it with every other item. Matching is not
+    transitive: an item joins the first earlier match found."""
+
+    cell_size = 2.0 * tolerance
+    buckets = {}
+    forms = []
+    labels = []
+
+    for item in items:
+        form = canonical_form(item, tolerance)
+        cells = [x / cell_size for x in form]
+        home = tuple([int(c // 1) for c in cells])
+        sides = [(0, -1) if c % 1 < 0.5 else (0, 1) for c in cells]
+
+        label = None
+        for offsets in product(*sides):
+            key = tuple([h + o for h, o in zip(home, offsets)])
+            for other in buckets.get(key, ()):
+                if _within(form, forms[other], tolerance):
+                    label = labels[other]
+                    break
+            if label is not None:
+                break
+
+        index = len(forms)
+        forms.append(form)
+        labels.append(index if label is None else label)
+        buckets.setdefault(home, []).append(index)
+
+    return labels
+
+
+def unique(items, tolerance=DEFAULT_TOLERANCE):
+    """Returns the items without duplicates within tolerance, keeping the
+    first of each group in order"""
+
+    items = list(items)
+    labels = unique_labels(items, tolerance)
+    return [item for i, item in enumerate(items) if labels[i] == i]
+
+
+def _within(a, b, tolerance):
+    for x, y in zip(a, b):
+        if abs(x - y) > tolerance:
+            return False
+    return len(a) == len(b)
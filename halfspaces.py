@@ -0,0 +1,200 @@
+import numpy as np
+
+from plane_groups import planes_to_arrays
+from planes import Plane
+from vector_batch import as_coordinate_array
+from vectors_final import Vector
+
+# side codes returned by classify_points
+BELOW = -1
+ON = 0
+ABOVE = 1
+
+SIDE_NAMES = {
+    BELOW: 'below',
+    ON: 'on',
+    ABOVE: 'above',
+}
+
+# points processed together; M x block_size results stay small enough to
+# remain in cache while they are reduced to side codes
+DEFAULT_BLOCK_SIZE = 65536
+
+
+def unit_planes(normals, constants):
+    """Scales every plane n.x = k to a unit normal, so n.x - k is the signed
+    distance of x from it. Planes with a zero normal get NaN coefficients"""
+
+    normals = np.asarray(normals, dtype=np.float64)
+    constants = np.asarray(constants, dtype=np.float64).reshape(-1)
+    if normals.ndim != 2 or len(normals) != len(constants):
+        raise ValueError('Expected N x d normals and N constant terms')
+
+    magnitudes = np.sqrt(np.einsum('ij,ij->i', normals, normals))
+    with np.errstate(divide='ignore'):
+        scale = 1.0 / magnitudes
+    scale[magnitudes == 0] = np.nan
+    return normals * scale[:, np.newaxis], constants * scale
+
+
+def signed_distances(points, normals, constants, block_size=DEFAULT_BLOCK_SIZE):
+    """Returns the M x N signed distances of M points from N planes n.x = k.
+
+    Distances are positive on the side the normal points to. points may be
+    an M x d array, a VectorBatch or a list of Vectors."""
+
+    points = as_coordinate_array(points)
+    unit_normals, unit_constants = unit_planes(normals, constants)
+    _check_dimensions(points, unit_normals)
+
+    distances = np.empty((len(points), len(unit_normals)))
+    for start in range(0, len(points), block_size):
+        block = distances[start:start + block_size]
+        np.dot(points[start:start + block_size], unit_normals.T, out=block)
+        block -= unit_constants
+    return distances
+
+
+def classify_points(points, normals, constants, tolerance=1e-10,
+                    block_size=DEFAULT_BLOCK_SIZE):
+    """Classifies M points against N planes n.x = k.
+
+    Returns an M x N int8 array of ABOVE, ON or BELOW; a point is ON a
+    plane when its distance from it is at most tolerance. Points are
+    processed block_size at a time, so only the int8 result is held for
+    all of them. Planes with a zero normal classify every point as ON."""
+
+    points = as_coordinate_array(points)
+    unit_normals, unit_constants = unit_planes(normals, constants)
+    _check_dimensions(points, unit_normals)
+
+    sides = np.empty((len(points), len(unit_normals)), dtype=np.int8)
+    for start in range(0, len(points), block_size):
+        distances = points[start:start + block_size].dot(unit_normals.T)
+        distances -= unit_constants
+        sides[start:start + block_size] = _sides_of(distances, tolerance)
+    return sides
+
+
+def classify_against_planes(points, planes, tolerance=1e-10):
+    """Classifies points against a sequence of Plane objects, as
+    classify_points does"""
+
+    normals, constants = planes_to_arrays(planes)
+    return classify_points(points, normals, constants, tolerance)
+
+
+class ConvexRegion(object):
+    """The convex region where n.x <= k for every plane n.x = k, i.e. the
+    points on or below all of its planes.
+
+    contains() walks the planes like the path to an inside leaf of a BSP
+    tree: each plane splits off the points above it, and only the points
+    still inside are tested against the next plane. Most points are
+    usually rejected by the first few planes, so with the planes in a good
+    order the cost per point approaches one dot product instead of N.
+    reorder() picks that order from a sample of points."""
+
+    def __init__(self, normals, constants, tolerance=1e-10):
+        self.normals, self.constants = unit_planes(normals, constants)
+        if np.isnan(self.constants).any():
+            raise ValueError('The planes of a region need nonzero normal vectors')
+        self.dimension = self.normals.shape[1]
+        self.tolerance = tolerance
+        self.order = np.arange(len(self.normals))
+
+    @classmethod
+    def from_planes(cls, planes, tolerance=1e-10):
+        """Builds the region below a sequence of Plane objects """
+
+        normals, constants = planes_to_arrays(planes)
+        return cls(normals, constants, tolerance)
+
+    def __len__(self):
+        return len(self.normals)
+
+    def reorder(self, sample_points):
+        """Orders the planes so those rejecting the most sample points come
+        first: each next plane is the one rejecting most of the sample
+        points that the planes before it let through. Returns self"""
+
+        sample = as_coordinate_array(sample_points)
+        _check_dimensions(sample, self.normals)
+        outside = sample.dot(self.normals.T) - self.constants > self.tolerance
+
+        remaining = np.ones(len(sample), dtype=bool)
+        unused = list(range(len(self.normals)))
+        order = []
+        while unused:
+            counts = outside[remaining][:, unused].sum(axis=0)
+            best = unused.pop(int(np.argmax(counts)))
+            order.append(best)
+            remaining &= ~outside[:, best]
+        self.order = np.array(order, dtype=np.intp)
+        return self
+
+    def contains(self, points, block_size=DEFAULT_BLOCK_SIZE):
+        """Returns a boolean array, True for the points inside the region or
+        within tolerance of its boundary"""
+
+        points = as_coordinate_array(points)
+        _check_dimensions(points, self.normals)
+
+        inside = np.zeros(len(points), dtype=bool)
+        for start in range(0, len(points), block_size):
+            block = points[start:start + block_size]
+            candidates = np.arange(len(block))
+            for plane in self.order:
+                keep = (block.dot(self.normals[plane]) - self.constants[plane]
+                        <= self.tolerance)
+                block = block[keep]
+                candidates = candidates[keep]
+                if not len(candidates):
+                    break
+            inside[start + candidates] = True
+        return inside
+
+    def classify(self, points):
+        """Returns an int8 array: BELOW for points strictly inside the
+        region, ON for points on its boundary and ABOVE for points outside"""
+
+        distances = signed_distances(points, self.normals, self.constants)
+        return _sides_of(distances.max(axis=1), self.tolerance)
+
+
+def _sides_of(distances, tolerance):
+    sides = np.zeros(distances.shape, dtype=np.int8)
+    sides[distances > tolerance] = ABOVE
+    sides[distances < -tolerance] = BELOW
+    return sides
+
+
+def _check_dimensions(points, normals):
+    if points.shape[1] != normals.shape[1]:
+        raise ValueError('Points and planes must have the same dimension')
+
+
+def main():
+    """ points against the faces of the unit cube """
+    cube = ConvexRegion([[1, 0, 0], [-1, 0, 0], [0, 1, 0],
+                         [0, -1, 0], [0, 0, 1], [0, 0, -1]],
+                        [1, 0, 1, 0, 1, 0])
+    points = [Vector([0.5, 0.5, 0.5]), Vector([1, 0.5, 0.5]), Vector([2, 0, 0])]
+
+    # should print [ True  True False]
+    print(cube.contains(points))
+
+    # should print [-1  0  1] (inside, on the boundary, outside)
+    print(cube.classify(points))
+
+    # should print [[-1  1] [-1  1] [-1  1]] against x + y + z = 3 and x = 0.25
+    planes = [Plane(Vector([1, 1, 1]), 3), Plane(Vector([1, 0, 0]), 0.25)]
+    print(classify_against_planes(points, planes))
+
+    p = Plane(normal_vector=Vector([-0.412, 3.806, 0.728]), constant_term=-3.46)
+    # should print 0.8878990
+    print(p.signed_distance_to(Vector([0, 0, 0])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+from array import array
+
+import numpy as np
+
+from hyperplanes import Hyperplane
+from numeric_backends import get_backend
+
+
+def hyperplanes_to_arrays(hyperplanes):
+    """Returns the normal vectors (N x d) and constant terms (N) of a
+    sequence of Hyperplanes, Lines or Planes as float64 arrays, read from
+    their coefficient arrays"""
+
+    hyperplanes = list(hyperplanes)
+    if not hyperplanes:
+        return np.empty((0, 0)), np.empty(0)
+
+    coefficients = np.array([h.coefficients for h in hyperplanes], dtype=np.float64)
+    if coefficients.ndim != 2:
+        raise ValueError('The hyperplanes must have the same dimension')
+    return coefficients[:, :-1], coefficients[:, -1]
+
+
+def hyperplanes_from_arrays(normals, constants, backend=None, cls=Hyperplane):
+    """Builds N hyperplanes n.x = k of class cls, e.g. Line or Plane, from
+    an N x d array of normals and N constant terms.
+
+    Each hyperplane keeps one row of coefficients as a float array; its
+    normal Vector, constant term and basepoint are only built when they
+    are first used."""
+
+    normals = np.asarray(normals, dtype=np.float64)
+    constants = np.asarray(constants, dtype=np.float64).reshape(-1)
+    _check_shapes(normals, constants)
+
+    backend = get_backend(backend)
+    rows = np.column_stack((normals, constants))
+    return [cls._from_coefficients(array('d', row.tobytes()), backend)
+            for row in rows]
+
+
+def first_nonzero_indices(normals, tolerance=1e-10):
+    """Returns the index of the first coordinate of every normal whose
+    absolute value exceeds tolerance, or -1 for normals near zero"""
+
+    nonzero = np.abs(np.asarray(normals, dtype=np.float64)) > tolerance
+    indices = np.argmax(nonzero, axis=1)
+    indices[~nonzero.any(axis=1)] = -1
+    return indices
+
+
+def basepoints(normals, constants, tolerance=1e-10):
+    """Returns the basepoints of N hyperplanes n.x = k as an N x d array:
+    the point where each crosses the axis of its first nonzero normal
+    coordinate, as in Hyperplane.basepoint. Rows of hyperplanes with a
+    zero normal are NaN"""
+
+    normals = np.asarray(normals, dtype=np.float64)
+    constants = np.asarray(constants, dtype=np.float64).reshape(-1)
+    _check_shapes(normals, constants)
+
+    indices = first_nonzero_indices(normals, tolerance)
+    points = np.zeros_like(normals)
+    rows = np.flatnonzero(indices >= 0)
+    columns = indices[rows]
+    points[rows, columns] = constants[rows] / normals[rows, columns]
+    points[indices < 0] = np.nan
+    return points
+
+
+def normalize(normals, constants, tolerance=1e-10):
+    """Scales every hyperplane n.x = k to a unit normal, keeping its
+    orientation. Hyperplanes whose normal is within tolerance of zero are
+    left unchanged. Returns the new normals and constant terms"""
+
+    normals = np.asarray(normals, dtype=np.float64)
+    constants = np.asarray(constants, dtype=np.float64).reshape(-1)
+    _check_shapes(normals, constants)
+
+    magnitudes = np.sqrt(np.einsum('ij,ij->i', normals, normals))
+    scale = np.ones_like(magnitudes)
+    nonzero = magnitudes >= tolerance
+    scale[nonzero] = 1.0 / magnitudes[nonzero]
+    return normals * scale[:, np.newaxis], constants * scale
+
+
+def _check_shapes(normals, constants):
+    if normals.ndim != 2 or len(normals) != len(constants):
+        raise ValueError('Expected N x d normals and N constant terms')
+
+
+def main():
+    """ basepoints and unit normals of constraints in 4 dimensions """
+    normals = np.array([[0, 2, 0, 0], [3, 0, 4, 0], [0, 0, 0, 0]])
+    constants = np.array([6, 10, 1])
+
+    # should print [[0. 3. 0. 0.] [3.333 0. 0. 0.] [nan nan nan nan]]
+    print(basepoints(normals, constants))
+
+    # should print [[0. 1. 0. 0.] [0.6 0. 0.8 0.] [0. 0. 0. 0.]] and [3. 2. 1.]
+    unit_normals, unit_constants = normalize(normals, constants)
+    print(unit_normals)
+    print(unit_constants)
+
+    # should print 3x_1 + 4x_3 = 10
+    hyperplanes = hyperplanes_from_arrays(normals, constants)
+    print(hyperplanes[1])
+
+
+if __name__ == '__main__':
+    main()
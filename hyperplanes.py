@@ -0,0 +1,258 @@
+from array import array
+
+from numeric_backends import FLOAT, backend_of, get_backend, in_backend_context, is_near_zero
+import predicates
+from vectors_final import Vector
+
+
+class Hyperplane(object):
+    """The hyperplane n.x = k in any dimension.
+
+    The equation is kept both as a normal Vector and constant term in the
+    hyperplane's backend and as a compact float array of coefficients
+    (n_1, ..., n_d, k); each form is built from the other on first use.
+    Hyperplanes built from arrays with hyperplane_batch.hyperplanes_from_arrays
+    only hold the float array until their Vector form is needed. The
+    basepoint is also computed on first use.
+
+    Line and Plane are the 2-d and 3-d specializations; a Hyperplane
+    without a normal vector takes the dimension given, or theirs."""
+
+    DEFAULT_DIMENSION = None
+
+    EITHER_DIM_OR_NORMAL_VEC_MUST_BE_PROVIDED_MSG = (
+        'Either the dimension of the hyperplane or the normal vector must be provided')
+
+    def __init__(self, normal_vector=None, constant_term=None, backend=None,
+                 dimension=None):
+        self.backend = backend_of(normal_vector, backend)
+
+        if not normal_vector:
+            dimension = dimension or self.DEFAULT_DIMENSION
+            if not dimension:
+                raise Exception(self.EITHER_DIM_OR_NORMAL_VEC_MUST_BE_PROVIDED_MSG)
+            all_zeros = ['0']*dimension
+            normal_vector = Vector(all_zeros, self.backend)
+        elif normal_vector.backend is not self.backend:
+            normal_vector = Vector(normal_vector.coordinates, self.backend)
+        self._normal_vector = normal_vector
+        self.dimension = normal_vector.dimension
+
+        if not constant_term:
+            constant_term = '0'
+        self._constant_term = self.backend.convert(constant_term)
+
+        self._coefficients = None
+        self._basepoint = None
+        self._has_basepoint = False
+
+    @classmethod
+    def _from_coefficients(cls, coefficients, backend):
+        """Builds a hyperplane from a float array (n_1, ..., n_d, k) without
+        building its normal Vector"""
+
+        hyperplane = cls.__new__(cls)
+        hyperplane.backend = backend
+        hyperplane.dimension = len(coefficients) - 1
+        hyperplane._normal_vector = None
+        hyperplane._constant_term = None
+        hyperplane._coefficients = coefficients
+        hyperplane._basepoint = None
+        hyperplane._has_basepoint = False
+        return hyperplane
+
+    @property
+    def normal_vector(self):
+        if self._normal_vector is None:
+            normal = self._coefficients[:-1].tolist()
+            if self.backend is FLOAT:
+                self._normal_vector = Vector._from_backend_values(normal, FLOAT)
+            else:
+                # from the shortest repr, so 0.1 becomes Decimal('0.1')
+                # rather than its binary expansion
+                self._normal_vector = Vector([repr(x) for x in normal], self.backend)
+        return self._normal_vector
+
+    @normal_vector.setter
+    def normal_vector(self, normal_vector):
+        self.constant_term
+        self._normal_vector = normal_vector
+        self.dimension = normal_vector.dimension
+        self._clear_cache()
+
+    @property
+    def constant_term(self):
+        if self._constant_term is None:
+            self._constant_term = self.backend.convert(repr(self._coefficients[-1]))
+        return self._constant_term
+
+    @constant_term.setter
+    def constant_term(self, constant_term):
+        self.normal_vector
+        self._constant_term = self.backend.convert(constant_term)
+        self._clear_cache()
+
+    @property
+    def coefficients(self):
+        """The equation as a float array (n_1, ..., n_d, k) """
+
+        if self._coefficients is None:
+            values = [float(x) for x in self._normal_vector.coordinates]
+            values.append(float(self._constant_term))
+            self._coefficients = array('d', values)
+        return self._coefficients
+
+    @property
+    def basepoint(self):
+        """The point where the hyperplane crosses the axis of the first
+        nonzero normal coordinate, or None when the normal is zero"""
+
+        if not self._has_basepoint:
+            self._basepoint = self._find_basepoint()
+            self._has_basepoint = True
+        return self._basepoint
+
+    def set_basepoint(self):
+        """Recomputes the basepoint """
+
+        self._has_basepoint = False
+        return self.basepoint
+
+    def _clear_cache(self):
+        self._coefficients = None
+        self._basepoint = None
+        self._has_basepoint = False
+
+    @in_backend_context
+    def _find_basepoint(self):
+        n = self.normal_vector.coordinates
+        initial_index = self.first_nonzero_index(n)
+        if initial_index is None:
+            return None
+
+        basepoint_coords = [self.backend.convert(0)]*self.dimension
+        basepoint_coords[initial_index] = self.constant_term/n[initial_index]
+        return Vector._from_backend_values(basepoint_coords, self.backend)
+
+    def __str__(self):
+        """writes the equation as a polynomial, e.g. 2x_1 - x_3 = 4 """
+
+        num_decimal_places = 3
+
+        def write_coefficient(coefficient, is_initial_term=False):
+            coefficient = round(coefficient, num_decimal_places)
+            if coefficient % 1 == 0:
+                coefficient = int(coefficient)
+
+            output = ''
+
+            if coefficient < 0:
+                output += '-'
+            if coefficient > 0 and not is_initial_term:
+                output += '+'
+
+            if not is_initial_term:
+                output += ' '
+
+            if abs(coefficient) != 1:
+                output += '{}'.format(abs(coefficient))
+
+            return output
+
+        n = self.normal_vector.coordinates
+        initial_index = self.first_nonzero_index(n)
+
+        if initial_index is None:
+            output = '0'
+        else:
+            terms = [write_coefficient(n[i], is_initial_term=(i==initial_index)) + 'x_{}'.format(i+1)
+                     for i in range(self.dimension) if round(n[i], num_decimal_places) != 0]
+            output = ' '.join(terms)
+
+        constant = round(self.constant_term, num_decimal_places)
+        if constant % 1 == 0:
+            constant = int(constant)
+        output += ' = {}'.format(constant)
+
+        return output
+
+    @staticmethod
+    def first_nonzero_index(iterable):
+        """Returns the index of the first item that is not near zero, or
+        None if there is none"""
+
+        for k, item in enumerate(iterable):
+            if not is_near_zero(item):
+                return k
+        return None
+
+    # __eq__ compares within a tolerance, which no hash can agree with for
+    # every pair of hyperplanes, so they are not hashable; deduplicate them
+    # with canonical.unique_labels or canonical.unique
+    __hash__ = None
+
+    @in_backend_context
+    def __eq__(self, hyperplane2):
+        """tests if the hyperplanes are parallel and share a point """
+
+        if predicates.exact_predicates_enabled():
+            return predicates.are_coincident(self.normal_vector, self.constant_term,
+                                             hyperplane2.normal_vector, hyperplane2.constant_term)
+
+        # conditional that accomodate a zero normal vector
+        if self.normal_vector.is_zero():
+            if not hyperplane2.normal_vector.is_zero():
+                return False
+            else:
+                diff = self.constant_term - self.backend.convert(hyperplane2.constant_term)
+                return is_near_zero(diff)
+        elif hyperplane2.normal_vector.is_zero():
+            return False
+
+        if not self.normal_vector.is_parallel_to(hyperplane2.normal_vector):
+            return False
+
+        basepoint_diff = self.basepoint.minus(hyperplane2.basepoint)
+        return basepoint_diff.is_orthogonal_to(self.normal_vector)
+
+    def __ne__(self, hyperplane2):
+        return not self == hyperplane2
+
+    def is_parallel_with(self, hyperplane2):
+        """tests if 2 hyperplanes are parallel by checking for parallel
+        normal vectors"""
+
+        return self.normal_vector.is_parallel_to(hyperplane2.normal_vector)
+
+    @in_backend_context
+    def signed_distance_to(self, point):
+        """distance of a point from the hyperplane, positive on the side
+        the normal vector points to """
+
+        n = self.normal_vector
+        offset = n.find_dot_product(point) - self.constant_term
+        return offset / n.find_magnitude()
+
+
+def hyperplane(coefficients, backend=None):
+    """Builds a Hyperplane from the coefficients (n_1, ..., n_d, k) of its
+    equation"""
+
+    coefficients = list(coefficients)
+    backend = get_backend(backend)
+    return Hyperplane(Vector(coefficients[:-1], backend), coefficients[-1], backend)
+
+
+def main():
+    """ a constraint in 5 dimensions """
+    h = hyperplane([0, 2, 0, -1, 4, 8])
+    # should print 2x_2 - x_4 + 4x_5 = 8
+    print(h)
+    # should print Vector: (Decimal('0'), Decimal('4'), Decimal('0'), Decimal('0'), Decimal('0'))
+    print(h.basepoint)
+    # should print True
+    print(h == hyperplane([0, -1, 0, 0.5, -2, -4]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""Opt-in call counting and timing for the Vector, Line and Plane classes.
+
+enable() wraps every method of vectors_final.Vector,
+hyperplanes.Hyperplane, line_intersections.Line and planes.Plane, plus
+DecimalBackend.convert, so that calls, exceptions, object allocations,
+Decimal conversions and time are recorded per method. disable() puts the original methods back, so
+there is no overhead at all while instrumentation is off:
+
+    with instrumented():
+        run_batch_job()
+    print(report_json())
+
+Counters are shared by all threads and not locked, so counts from
+concurrent threads may be slightly low.
+"""
+import json
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from timeit import default_timer
+
+from hyperplanes import Hyperplane
+from line_intersections import Line
+from numeric_backends import DecimalBackend
+from planes import Plane
+from vectors_final import Vector
+
+DEFAULT_TARGETS = (Vector, Hyperplane, Line, Plane, DecimalBackend)
+
+# methods that are not wrapped: they must keep working on half-built
+# objects, or are called by pickle rather than by user code
+SKIPPED = frozenset(['__new__', '__setattr__', '__delattr__', '__reduce__',
+                     '__getattribute__'])
+
+# methods whose calls create an object of their class
+ALLOCATING = frozenset(['__init__', '_from_backend_values', '_from_coefficients'])
+
+_stats = {}
+_originals = []
+_timing = threading.local()
+
+
+class MethodStats(object):
+    """Counters of one method. total_time includes the methods it called,
+    own_time does not"""
+
+    __slots__ = ('calls', 'exceptions', 'total_time', 'own_time')
+
+    def __init__(self):
+        self.calls = 0
+        self.exceptions = 0
+        self.total_time = 0.0
+        self.own_time = 0.0
+
+    def as_dict(self):
+        return {'calls': self.calls, 'exceptions': self.exceptions,
+                'total_time': self.total_time, 'own_time': self.own_time}
+
+
+def enable(targets=DEFAULT_TARGETS):
+    """Wraps the methods of the target classes. Calling it again while
+    enabled has no effect"""
+
+    if _originals:
+        return
+    for cls in targets:
+        for name, attribute in list(vars(cls).items()):
+            wrapped = _wrap_attribute(cls, name, attribute)
+            if wrapped is not None:
+                _originals.append((cls, name, attribute))
+                setattr(cls, name, wrapped)
+
+
+def disable():
+    """Restores the original methods. Recorded counters are kept """
+
+    while _originals:
+        cls, name, attribute = _originals.pop()
+        setattr(cls, name, attribute)
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def reset():
+    """Clears all recorded counters """
+
+    _stats.clear()
+
+
+@contextmanager
+def instrumented(targets=DEFAULT_TARGETS, fresh=True):
+    """Enables instrumentation inside the with block, starting from zeroed
+    counters unless fresh is False"""
+
+    if fresh:
+        reset()
+    enable(targets)
+    try:
+        yield
+    finally:
+        disable()
+
+
+def report():
+    """Returns the counters as a dict:
+
+        {'methods': {'Vector.plus': {'calls': ..., 'exceptions': ...,
+                                     'total_time': ..., 'own_time': ...}},
+         'allocations': {'Vector': ..., 'Hyperplane': ...},
+         'decimal_conversions': ...}
+
+    Methods are listed under 'Class.method'; times are in seconds."""
+
+    methods = {}
+    allocations = {}
+    for (cls_name, name), stats in _stats.items():
+        methods['{}.{}'.format(cls_name, name)] = stats.as_dict()
+        if name in ALLOCATING:
+            allocations[cls_name] = allocations.get(cls_name, 0) + stats.calls
+
+    conversions = _stats.get(('DecimalBackend', 'convert'))
+    return {
+        'methods': methods,
+        'allocations': allocations,
+        'decimal_conversions': conversions.calls if conversions else 0,
+    }
+
+
+def report_json(indent=2):
+    """Returns report() as a JSON string """
+
+    return json.dumps(report(), indent=indent, sort_keys=True)
+
+
+def save_report(path):
+    """Writes report() to a JSON file """
+
+    with open(path, 'w') as f:
+        f.write(report_json())
+
+
+def top_methods(key='own_time', count=10):
+    """Returns the count (name, counters) pairs with the largest value of
+    key, e.g. 'own_time' or 'calls'"""
+
+    methods = report()['methods']
+    ranked = sorted(methods.items(), key=lambda item: item[1][key], reverse=True)
+    return ranked[:count]
+
+
+def _wrap_attribute(cls, name, attribute):
+    """Returns an instrumented replacement for a class attribute, or None
+    if it is not a method to wrap"""
+
+    if name in SKIPPED:
+        return None
+    if isinstance(attribute, staticmethod):
+        return staticmethod(_wrap(cls.__name__, name, attribute.__func__))
+    if isinstance(attribute, classmethod):
+        return classmethod(_wrap(cls.__name__, name, attribute.__func__))
+    if callable(attribute) and hasattr(attribute, '__name__'):
+        return _wrap(cls.__name__, name, attribute)
+    return None
+
+
+def _wrap(cls_name, name, function):
+    key = (cls_name, name)
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _stats.setdefault(key, MethodStats())
+        stack = getattr(_timing, 'stack', None)
+        if stack is None:
+            stack = _timing.stack = []
+
+        stats.calls += 1
+        stack.append(0.0)
+        start = default_timer()
+        try:
+            return function(*args, **kwargs)
+        except BaseException:
+            stats.exceptions += 1
+            raise
+        finally:
+            elapsed = default_timer() - start
+            children = stack.pop()
+            stats.total_time += elapsed
+            stats.own_time += elapsed - children
+            if stack:
+                stack[-1] += elapsed
+
+    wrapper.__wrapped__ = function
+    return wrapper
+
+
+def main():
+    """ profiles the plane equality quiz """
+    with instrumented():
+        p1 = Plane(normal_vector=Vector([-0.412, 3.806, 0.728]), constant_term=-3.46)
+        p2 = Plane(normal_vector=Vector([1.03, -9.515, -1.82]), constant_term=8.65)
+        p1 == p2
+
+    counters = report()
+    # should print allocations of Vector and Hyperplane and the Decimal conversions
+    print(counters['allocations'])
+    print(counters['decimal_conversions'])
+    for name, stats in top_methods(count=5):
+        print('{:40} {:6} calls {:10.6f} s'.format(name, stats['calls'], stats['own_time']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,386 @@
+from decimal import getcontext, setcontext, InvalidOperation
+from functools import wraps
+
+from vectors_final import Vector
+
+# compiled programs, keyed by their source
+_compiled = {}
+
+
+class LazyVector(object):
+    """A vector expression that is only computed when it is evaluated.
+
+    plus, minus, multiply, times_scalar and find_normalization_vector build
+    a graph instead of Vectors; find_dot_product, find_squared_magnitude
+    and find_magnitude build LazyScalars. evaluate() compiles the graph
+    into one function in which every elementwise chain is a single list
+    comprehension over the leaf coordinates, so no intermediate Vector is
+    built and the coordinates are walked once per reduction.
+
+    Identical subexpressions, e.g. the same magnitude used twice or the
+    same sum used on both sides of a product, are computed once. The
+    arithmetic is done in the backend of the leftmost Vector with the same
+    operations in the same order as the eager methods, so the results are
+    identical to theirs."""
+
+    def __init__(self, op, args, dimension, backend):
+        self.op = op
+        self.args = args
+        self.dimension = dimension
+        self.backend = backend
+        self._key = None
+
+    def key(self):
+        """A structural key: equal keys mean the same computation """
+
+        if self._key is None:
+            if self.op == 'leaf':
+                self._key = ('leaf', id(self.args[0]))
+            else:
+                self._key = (self.op,) + tuple(a.key() for a in self.args)
+        return self._key
+
+    def _combine(self, op, v):
+        v = lazy(v)
+        if v.dimension != self.dimension:
+            raise ValueError('The vectors must have the same dimension')
+        return LazyVector(op, (self, v), self.dimension, self.backend)
+
+    def plus(self, v):
+        return self._combine('plus', v)
+
+    def minus(self, v):
+        return self._combine('minus', v)
+
+    def multiply(self, v):
+        return self._combine('multiply', v)
+
+    def times_scalar(self, c):
+        """c may be a number or a LazyScalar """
+
+        return LazyVector('scale', (self, _scalar(c, self.backend)),
+                          self.dimension, self.backend)
+
+    def find_normalization_vector(self):
+        return LazyVector('divide', (self, self.find_magnitude()),
+                          self.dimension, self.backend)
+
+    def find_dot_product(self, v):
+        v = lazy(v)
+        if v.dimension != self.dimension:
+            raise ValueError('The vectors must have the same dimension')
+        return LazyScalar('dot', (self, v), self.backend)
+
+    def find_squared_magnitude(self):
+        return LazyScalar('dot', (self, self), self.backend)
+
+    def find_magnitude(self):
+        return LazyScalar('sqrt', (self.find_squared_magnitude(),), self.backend)
+
+    def evaluate(self):
+        """Computes the expression and returns it as a Vector """
+
+        return evaluate(self)[0]
+
+
+class LazyScalar(object):
+    """A scalar expression over LazyVectors """
+
+    def __init__(self, op, args, backend):
+        self.op = op
+        self.args = args
+        self.backend = backend
+        self._key = None
+
+    def key(self):
+        if self._key is None:
+            if self.op == 'value':
+                self._key = ('value', id(self))
+            else:
+                self._key = (self.op,) + tuple(a.key() for a in self.args)
+        return self._key
+
+    def evaluate(self):
+        """Computes the expression and returns a number of the backend """
+
+        return evaluate(self)[0]
+
+
+def lazy(v):
+    """Wraps a Vector as the leaf of a lazy expression; LazyVectors are
+    returned as they are"""
+
+    if isinstance(v, LazyVector):
+        return v
+    if not isinstance(v, Vector):
+        raise TypeError('Expected a Vector or a LazyVector')
+    return LazyVector('leaf', (v,), v.dimension, v.backend)
+
+
+def evaluate(*expressions):
+    """Evaluates LazyVectors and LazyScalars in one compiled function per
+    backend, so the subexpressions they share are computed once. Each
+    expression is computed in the backend of its leftmost Vector, as the
+    eager methods are. Returns a list of Vectors and numbers"""
+
+    groups = {}
+    for i, expression in enumerate(expressions):
+        groups.setdefault(expression.backend, []).append(i)
+
+    results = [None]*len(expressions)
+    for backend, indices in groups.items():
+        program = _Program([expressions[i] for i in indices])
+        leaves = [leaf.args[0] for leaf in program.leaves]
+        values = program.run(backend, [_coordinates_in(v, backend) for v in leaves])
+        for i, value in zip(indices, values):
+            results[i] = value
+    return results
+
+
+def fuse(function):
+    """Decorates a function that chains Vector methods so that it runs
+    as one compiled, fused program.
+
+    The function is traced once per backend and argument dimensions, with
+    LazyVectors standing in for its Vector arguments, e.g.
+
+        @fuse
+        def feature(a, w, u):
+            return a.plus(w).times_scalar(3).find_dot_product(u)
+
+        scores = [feature(a, w, u) for a in vectors]
+
+    Later calls skip building the graph and only run the compiled loop.
+    Arguments must be Vectors; any other values the function uses,
+    including Vectors it closes over, are fixed at tracing time."""
+
+    plans = {}
+
+    @wraps(function)
+    def fused(*vectors):
+        backend = vectors[0].backend
+        signature = (backend, tuple(v.dimension for v in vectors))
+        plan = plans.get(signature)
+        if plan is None:
+            arguments = [LazyVector('leaf', (_Argument(i),), v.dimension, backend)
+                         for i, v in enumerate(vectors)]
+            program = _Program([function(*arguments)])
+            plan = plans.setdefault(signature, (program, _leaf_sources(program, backend)))
+
+        program, sources = plan
+        coordinates = [_coordinates_in(vectors[source], backend)
+                       if isinstance(source, int) else source
+                       for source in sources]
+        return program.run(backend, coordinates)[0]
+
+    return fused
+
+
+def _leaf_sources(program, backend):
+    """For every leaf of a traced program, the index of the argument it
+    stands for, or the coordinates of a captured Vector in backend"""
+
+    sources = []
+    for leaf in program.leaves:
+        value = leaf.args[0]
+        if isinstance(value, _Argument):
+            sources.append(value.index)
+        else:
+            sources.append(_coordinates_in(value, backend))
+    return sources
+
+
+class _Argument(object):
+    """Stands in for the Vector passed as argument index of a fused
+    function while it is traced"""
+
+    def __init__(self, index):
+        self.index = index
+
+
+class _Program(object):
+    """Python source computing a set of expressions, and its compiled
+    function.
+
+    Scalars become statements, computed in dependency order. Each vector
+    output and each dot product becomes one list comprehension whose loop
+    variables are the coordinates of the leaves it uses; vector
+    subexpressions used more than once in it are bound per element with
+    'for t in (expr,)'."""
+
+    def __init__(self, expressions):
+        self.leaves = []
+        self.leaf_params = {}
+        self.constants = []
+        self.constant_params = {}
+        self.statements = []
+        self.scalar_names = {}
+
+        outputs = []
+        for expression in expressions:
+            if isinstance(expression, LazyVector):
+                outputs.append(self._comprehension([expression]))
+            else:
+                outputs.append(self._scalar(expression))
+
+        parameters = ['sqrt'] + [self.leaf_params[leaf.key()] for leaf in self.leaves] + \
+            ['c{}'.format(i) for i in range(len(self.constants))]
+        lines = ['def fused({}):'.format(', '.join(parameters))]
+        lines += ['    ' + statement for statement in self.statements]
+        lines.append('    return ({},)'.format(', '.join(outputs)))
+        self.source = '\n'.join(lines)
+
+        function = _compiled.get(self.source)
+        if function is None:
+            namespace = {}
+            exec(self.source, namespace)
+            function = _compiled.setdefault(self.source, namespace['fused'])
+        self.function = function
+        self.is_vector = [isinstance(e, LazyVector) for e in expressions]
+
+    def run(self, backend, coordinates):
+        context = backend.context
+        previous = getcontext()
+        if context is not None:
+            setcontext(context)
+        try:
+            constants = [backend.convert(c) for c in self.constants]
+            results = self.function(backend.sqrt, *(coordinates + constants))
+        except (ZeroDivisionError, InvalidOperation):
+            raise Exception(Vector.CANNOT_NORMALIZE_ZERO_VECTOR_MSG)
+        finally:
+            if context is not None:
+                setcontext(previous)
+
+        return [Vector._from_backend_values(r, backend) if is_vector else r
+                for r, is_vector in zip(results, self.is_vector)]
+
+    def _scalar(self, node):
+        """Returns the name of a variable holding the scalar's value """
+
+        key = node.key()
+        name = self.scalar_names.get(key)
+        if name is not None:
+            return name
+
+        if node.op == 'value':
+            name = self.constant_params[key] = 'c{}'.format(len(self.constants))
+            self.constants.append(node.args[0])
+        else:
+            if node.op == 'sqrt':
+                expression = 'sqrt({})'.format(self._scalar(node.args[0]))
+            else:
+                expression = 'sum({})'.format(self._comprehension(node.args, '*'))
+            name = 's{}'.format(len(self.statements))
+            self.statements.append('{} = {}'.format(name, expression))
+
+        self.scalar_names[key] = name
+        return name
+
+    def _comprehension(self, vectors, operator=None):
+        """Returns a list comprehension computing a vector, or the
+        elementwise product of two vectors"""
+
+        uses = {}
+        for vector in vectors:
+            _count_uses(vector, uses)
+
+        state = {'loop_vars': {}, 'bound': {}, 'bindings': []}
+        elements = [self._element(vector, uses, state) for vector in vectors]
+        element = ' {} '.format(operator).join(elements) if operator else elements[0]
+
+        loop_vars = state['loop_vars']
+        leaf_keys = sorted(loop_vars, key=lambda key: loop_vars[key])
+        names = [loop_vars[key] for key in leaf_keys]
+        sources = [self.leaf_params[key] for key in leaf_keys]
+        loop = ' for {} in zip({})'.format(
+            ', '.join(names) + (',' if len(names) == 1 else ''), ', '.join(sources))
+        loop += ''.join(' for {} in ({},)'.format(name, expression)
+                        for name, expression in state['bindings'])
+        return '[{}{}]'.format(element, loop)
+
+    def _element(self, node, uses, state):
+        key = node.key()
+        if node.op == 'leaf':
+            if key not in self.leaf_params:
+                self.leaf_params[key] = 'L{}'.format(len(self.leaves))
+                self.leaves.append(node)
+            loop_vars = state['loop_vars']
+            if key not in loop_vars:
+                loop_vars[key] = 'x{}'.format(len(loop_vars))
+            return loop_vars[key]
+
+        if key in state['bound']:
+            return state['bound'][key]
+
+        a = self._element(node.args[0], uses, state)
+        if node.op in ('scale', 'divide'):
+            b = self._scalar(node.args[1])
+        else:
+            b = self._element(node.args[1], uses, state)
+        expression = '({} {} {})'.format(a, _SYMBOLS[node.op], b)
+
+        if uses[key] > 1:
+            name = 't{}'.format(len(state['bindings']))
+            state['bindings'].append((name, expression))
+            state['bound'][key] = name
+            return name
+        return expression
+
+
+_SYMBOLS = {'plus': '+', 'minus': '-', 'multiply': '*', 'scale': '*', 'divide': '/'}
+
+
+def _count_uses(node, uses):
+    """Counts how many parents use each vector node of a graph """
+
+    key = node.key()
+    uses[key] = uses.get(key, 0) + 1
+    if uses[key] == 1 and node.op not in ('leaf',):
+        for arg in node.args:
+            if isinstance(arg, LazyVector):
+                _count_uses(arg, uses)
+
+
+def _scalar(c, backend):
+    if isinstance(c, LazyScalar):
+        return c
+    return LazyScalar('value', (c,), backend)
+
+
+def _coordinates_in(vector, backend):
+    if vector.backend is backend:
+        return vector.coordinates
+    convert = backend.convert
+    return [convert(x) for x in vector.coordinates]
+
+
+def main():
+    """ a chained expression evaluated in one pass """
+    v = Vector([8.218, -9.341])
+    w = Vector([-1.129, 2.111])
+    u = Vector([3.5, 1.0])
+
+    eager = v.plus(w).times_scalar(3).find_dot_product(u)
+    fused = lazy(v).plus(w).times_scalar(3).find_dot_product(u).evaluate()
+
+    # should print the same number twice
+    print(eager)
+    print(fused)
+
+    # the magnitude of v + w is computed once for both results
+    s = lazy(v).plus(w)
+    unit, length = evaluate(s.find_normalization_vector(), s.find_magnitude())
+    print(unit)
+    print(length)
+
+    @fuse
+    def feature(a, b, c):
+        return a.plus(b).times_scalar(3).find_dot_product(c)
+
+    # should print the eager result again, from a program traced once
+    print(feature(v, w, u))
+
+
+if __name__ == '__main__':
+    main()
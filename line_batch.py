@@ -0,0 +1,127 @@
+import numpy as np
+
+from canonical import DEFAULT_TOLERANCE
+from hyperplane_batch import hyperplanes_to_arrays
+from line_intersections import Line
+from vector_batch import vector_from_floats
+from vectors_final import Vector
+
+# status codes returned by intersect_lines
+UNIQUE = 0
+PARALLEL = 1
+COINCIDENT = 2
+
+STATUS_NAMES = {
+    UNIQUE: 'unique',
+    PARALLEL: 'parallel',
+    COINCIDENT: 'coincident',
+}
+
+
+def lines_to_arrays(lines):
+    """Returns the normal vectors (N x 2) and constant terms (N) of a
+    sequence of Line objects as float64 arrays"""
+
+    normals, constants = hyperplanes_to_arrays(lines)
+    return normals.reshape(-1, 2), constants
+
+
+def intersect_lines(normals1, constants1, normals2, constants2,
+                    tolerance=1e-10):
+    """Intersects N pairs of 2-d lines n.x = k in one vectorized pass.
+
+    Line i of the first set is intersected with line i of the second set.
+    Returns (points, status): points is an N x 2 array holding the
+    intersection of each pair, NaN where there is no unique one, and
+    status is an N array of UNIQUE, PARALLEL or COINCIDENT.
+
+    Lines count as parallel when |A*D - B*C| <= tolerance * |n1| * |n2|,
+    i.e. when the sine of the angle between the normals is within
+    tolerance of zero, and as coincident when (A, B, k1) is parallel to
+    (C, D, k2) by the same measure.
+
+    A line with a zero normal, |n| < 1e-10 as in Vector.is_zero, is
+    treated as Line.intersection_with treats it: it is coincident with
+    another zero-normal line with the same constant term, and parallel to
+    every other line."""
+
+    n1 = np.asarray(normals1, dtype=np.float64).reshape(-1, 2)
+    n2 = np.asarray(normals2, dtype=np.float64).reshape(-1, 2)
+    k1 = np.asarray(constants1, dtype=np.float64).reshape(-1)
+    k2 = np.asarray(constants2, dtype=np.float64).reshape(-1)
+    if not (len(n1) == len(n2) == len(k1) == len(k2)):
+        raise ValueError('All inputs must describe the same number of lines')
+
+    A, B = n1[:, 0], n1[:, 1]
+    C, D = n2[:, 0], n2[:, 1]
+
+    denominator = A*D - B*C
+    magnitude1 = np.hypot(A, B)
+    magnitude2 = np.hypot(C, D)
+    parallel = np.abs(denominator) <= tolerance * magnitude1 * magnitude2
+
+    zero1 = magnitude1 < DEFAULT_TOLERANCE
+    zero2 = magnitude2 < DEFAULT_TOLERANCE
+    degenerate = zero1 | zero2
+    parallel |= degenerate
+
+    status = np.full(len(n1), UNIQUE, dtype=np.int8)
+    points = np.full((len(n1), 2), np.nan)
+
+    unique = ~parallel
+    d = denominator[unique]
+    points[unique, 0] = (D*k1 - B*k2)[unique] / d
+    points[unique, 1] = (-C*k1 + A*k2)[unique] / d
+
+    regular = parallel & ~degenerate
+    if regular.any():
+        row1 = np.column_stack((A, B, k1))[regular]
+        row2 = np.column_stack((C, D, k2))[regular]
+        cross = np.cross(row1, row2)
+        same = (np.sqrt(np.einsum('ij,ij->i', cross, cross)) <=
+                tolerance * np.linalg.norm(row1, axis=1) *
+                np.linalg.norm(row2, axis=1))
+        status[regular] = np.where(same, COINCIDENT, PARALLEL)
+
+    if degenerate.any():
+        same = zero1 & zero2 & (np.abs(k1 - k2) < DEFAULT_TOLERANCE)
+        status[degenerate] = np.where(same[degenerate], COINCIDENT, PARALLEL)
+
+    return points, status
+
+
+def intersect_line_pairs(lines1, lines2, tolerance=1e-10):
+    """Intersects Line objects pairwise. Returns a list holding a Vector for
+    every pair with a unique intersection and None otherwise, and the
+    status array from intersect_lines"""
+
+    normals1, constants1 = lines_to_arrays(lines1)
+    normals2, constants2 = lines_to_arrays(lines2)
+    points, status = intersect_lines(normals1, constants1,
+                                     normals2, constants2, tolerance)
+
+    results = []
+    for point, code in zip(points.tolist(), status.tolist()):
+        results.append(vector_from_floats(point) if code == UNIQUE else None)
+    return results, status
+
+
+def main():
+    """ batch version of the line intersection quiz """
+    lines1 = [Line(Vector([4.046, 2.836]), '1.21'),
+              Line(Vector([7.204, 3.182]), '8.68'),
+              Line(Vector([1.82, 5.562]), '6.744')]
+    lines2 = [Line(Vector([10.115, 7.09]), '3.025'),
+              Line(Vector([8.172, 4.114]), '9.883'),
+              Line(Vector([1.773, 8.343]), '9.525')]
+
+    points, status = intersect_lines(*(lines_to_arrays(lines1) +
+                                       lines_to_arrays(lines2)))
+
+    # should print coincident, (1.173, 0.073), (0.618, 1.010)
+    for point, code in zip(points, status):
+        print('{}: {}'.format(STATUS_NAMES[code], point))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Vectors, lines, planes and hyperplanes with selectable numeric backends.
+
+    from linear_algebra import Vector, Plane, precision
+
+    with precision(30):
+        p = Plane(Vector(['1', '2', '3']), '4')
+
+Importing the package only loads the core classes, which need nothing
+beyond the standard library, and changes no global state: the decimal
+context is only switched around the arithmetic of Decimal-backed objects.
+The numpy and multiprocessing based helpers are imported the first time
+one of their names is read, e.g. linear_algebra.VectorBatch, so programs
+that do not use them do not pay for loading them.
+
+Vector is vectors_final.Vector; the other vector*.py scripts are the
+standalone exercises it grew out of and are not part of the package.
+"""
+from __future__ import absolute_import
+
+import sys
+from importlib import import_module
+from types import ModuleType
+
+from hyperplanes import Hyperplane, hyperplane
+from lazy_vector import fuse, lazy
+from line_intersections import Line
+from linear_system import LinearSystem, Parametrization
+from numeric_backends import (DECIMAL, FLOAT, FRACTION, decimal_backend,
+                              get_backend, precision, use_backend)
+from planes import Plane
+from predicates import use_exact_predicates
+from vector_accumulator import VectorAccumulator, centroid, sum_vectors
+from vectors_final import Vector
+
+__all__ = [
+    'Vector', 'Hyperplane', 'hyperplane', 'Line', 'Plane',
+    'LinearSystem', 'Parametrization',
+    'FLOAT', 'DECIMAL', 'FRACTION', 'get_backend', 'decimal_backend',
+    'use_backend', 'precision', 'use_exact_predicates',
+    'VectorAccumulator', 'sum_vectors', 'centroid', 'lazy', 'fuse',
+]
+
+# names imported the first time they are read, and the modules defining
+# them; all of these modules load numpy or multiprocessing
+_OPTIONAL = {
+    'VectorBatch': 'vector_batch',
+    'VectorStatistics': 'vector_stats',
+    'statistics_of': 'vector_stats',
+    'VectorStore': 'vector_store',
+    'save_vectors': 'vector_store',
+    'read_csv_chunks': 'vector_stream',
+    'KDTreeIndex': 'vector_index',
+    'CosineIndex': 'vector_index',
+    'hyperplanes_from_arrays': 'hyperplane_batch',
+    'hyperplanes_to_arrays': 'hyperplane_batch',
+    'intersect_lines': 'line_batch',
+    'group_planes': 'plane_groups',
+    'ConvexRegion': 'halfspaces',
+    'classify_points': 'halfspaces',
+    'Segment': 'segments',
+    'find_intersecting_pairs': 'segments',
+    'gram_matrix': 'pairwise',
+    'angle_matrix': 'pairwise',
+    'qr': 'projections',
+    'gram_schmidt': 'projections',
+    'vertex_normals': 'mesh',
+    'parallel_map': 'parallel_jobs',
+    'map_intersection_with': 'parallel_jobs',
+    'map_is_parallel_with': 'parallel_jobs',
+    'map_plane_eq': 'parallel_jobs',
+}
+
+
+class _Package(ModuleType):
+    """The package module. Reading one of the _OPTIONAL names imports the
+    module defining it and keeps the value, so later reads are plain
+    attribute lookups"""
+
+    def __getattr__(self, name):
+        module_name = _OPTIONAL.get(name)
+        if module_name is None:
+            raise AttributeError("module '{}' has no attribute '{}'".format(
+                self.__name__, name))
+        value = getattr(import_module(module_name), name)
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_OPTIONAL))
+
+
+_package = _Package(__name__, __doc__)
+_package.__dict__.update(sys.modules[__name__].__dict__)
+# Python 2 clears the globals of a module object once it is freed, and
+# _Package.__getattr__ still reads them
+_package._module = sys.modules[__name__]
+sys.modules[__name__] = _package
@@ -0,0 +1,348 @@
+from numeric_backends import FLOAT, in_backend_context
+from vectors_final import Vector
+from planes import Plane
+
+
+class LinearSystem(object):
+    """A system of Plane equations solved by Gaussian elimination.
+
+    Row operations act on the system in place. compute_triangular_form,
+    compute_rref and compute_solution work on a copy: they read the planes
+    into rows of numbers once, eliminate with partial pivoting and only
+    build Plane objects for the returned system. Float systems with at least
+    ARRAY_MIN_DIMENSION variables are eliminated on a numpy array.
+
+    Zero tests are relative to each equation: a coefficient counts as zero
+    when it is within tolerance times the largest coefficient of its row in
+    the original system, and the constant term of an equation left without
+    coefficients when it is within tolerance times the largest number of
+    that row. Pivots are chosen by the same scaled magnitudes, so badly
+    scaled equations do not hide each other. By default the tolerance is
+    1e-10, raised to cover the relative rounding error of the backend."""
+
+    ALL_PLANES_MUST_BE_IN_SAME_DIM_MSG = 'All planes in the system should live in the same dimension'
+    NO_SOLUTIONS_MSG = 'No solutions'
+
+    ARRAY_MIN_DIMENSION = 16
+
+    ROUNDING_SLACK = 100
+
+    def __init__(self, planes, tolerance=None):
+        try:
+            d = planes[0].dimension
+            for p in planes:
+                assert p.dimension == d
+
+            self.planes = list(planes)
+            self.dimension = d
+            self.backend = planes[0].backend
+            if tolerance is None:
+                tolerance = self._default_tolerance()
+            self.tolerance = tolerance
+
+        except AssertionError:
+            raise Exception(self.ALL_PLANES_MUST_BE_IN_SAME_DIM_MSG)
+
+        except IndexError:
+            raise ValueError('A linear system needs at least one plane')
+
+    def _default_tolerance(self):
+        return max(1e-10, self.ROUNDING_SLACK * self.backend.epsilon())
+
+    def swap_rows(self, row1, row2):
+        """Swaps two equations of the system """
+
+        self.planes[row1], self.planes[row2] = self.planes[row2], self.planes[row1]
+
+    @in_backend_context
+    def multiply_coefficient_and_row(self, coefficient, row):
+        """Multiplies an equation by a scalar """
+
+        p = self.planes[row]
+        c = self.backend.convert(coefficient)
+        self.planes[row] = Plane(p.normal_vector.times_scalar(c),
+                                 p.constant_term * c, self.backend)
+
+    @in_backend_context
+    def add_multiple_times_row_to_row(self, coefficient, row_to_add, row_to_be_added_to):
+        """Adds coefficient times one equation to another equation """
+
+        p1 = self.planes[row_to_add]
+        p2 = self.planes[row_to_be_added_to]
+        c = self.backend.convert(coefficient)
+        self.planes[row_to_be_added_to] = Plane(
+            p2.normal_vector.plus(p1.normal_vector.times_scalar(c)),
+            p2.constant_term + p1.constant_term * c, self.backend)
+
+    def indices_of_first_nonzero_terms_in_each_row(self):
+        """Returns the index of each equation's first nonzero coefficient, or
+        -1 for equations without one"""
+
+        indices = [-1] * len(self.planes)
+        for i, p in enumerate(self.planes):
+            coordinates = p.normal_vector.coordinates
+            bound = self.tolerance * float(max(abs(x) for x in coordinates))
+            for k, item in enumerate(coordinates):
+                if float(abs(item)) > bound:
+                    indices[i] = k
+                    break
+        return indices
+
+    def compute_triangular_form(self):
+        """Returns an equivalent system in triangular form """
+
+        rows, pivots, scales = self._reduced_rows(reduced=False)
+        return self._system_from_rows(rows)
+
+    def compute_rref(self):
+        """Returns an equivalent system in reduced row echelon form """
+
+        rows, pivots, scales = self._reduced_rows(reduced=True)
+        return self._system_from_rows(rows)
+
+    def compute_solution(self):
+        """Returns the unique solution as a Vector, or a Parametrization when
+        there are infinitely many. Raises an Exception if there are none"""
+
+        rows, pivots, scales = self._reduced_rows(reduced=True)
+
+        for row, (coefficient_scale, row_scale) in zip(rows[len(pivots):], scales[len(pivots):]):
+            if float(abs(row[-1])) > self.tolerance * row_scale:
+                raise Exception(self.NO_SOLUTIONS_MSG)
+
+        convert = self.backend.convert
+        zero = convert(0)
+        if len(pivots) == self.dimension:
+            return Vector([rows[i][-1] for i in range(self.dimension)], self.backend)
+
+        free_variables = [j for j in range(self.dimension) if j not in pivots]
+        basepoint = [zero] * self.dimension
+        for i, column in enumerate(pivots):
+            basepoint[column] = rows[i][-1]
+
+        direction_vectors = []
+        for free in free_variables:
+            direction = [zero] * self.dimension
+            direction[free] = convert(1)
+            for i, column in enumerate(pivots):
+                direction[column] = -rows[i][free]
+            direction_vectors.append(Vector(direction, self.backend))
+
+        return Parametrization(Vector(basepoint, self.backend), direction_vectors)
+
+    def _system_from_rows(self, rows):
+        planes = [Plane(Vector(row[:-1], self.backend), row[-1], self.backend)
+                  for row in rows]
+        return LinearSystem(planes, self.tolerance)
+
+    @in_backend_context
+    def _reduced_rows(self, reduced):
+        """Eliminates on plain rows [coefficients..., constant] and returns
+        them with the pivot column of each leading row and the
+        (coefficient scale, row scale) of each row, see _row_scales"""
+
+        rows = self._augmented_rows()
+        scales = _row_scales(rows, self.dimension)
+        if self.backend is FLOAT and self.dimension >= self.ARRAY_MIN_DIMENSION:
+            rows, pivots = _row_reduce_array(rows, scales, self.dimension,
+                                             self.tolerance, reduced)
+            return rows, pivots, scales
+
+        pivots = _row_reduce_rows(rows, scales, self.dimension, self.tolerance,
+                                  reduced, self.backend.convert(0))
+        return rows, pivots, scales
+
+    def _augmented_rows(self):
+        return [list(p.normal_vector.coordinates) + [p.constant_term]
+                for p in self.planes]
+
+    def __len__(self):
+        return len(self.planes)
+
+    def __getitem__(self, i):
+        return self.planes[i]
+
+    def __setitem__(self, i, x):
+        if x.dimension != self.dimension:
+            raise Exception(self.ALL_PLANES_MUST_BE_IN_SAME_DIM_MSG)
+        self.planes[i] = x
+
+    def __str__(self):
+        """writes the system one equation per line """
+
+        ret = 'Linear System:\n'
+        temp = ['Equation {}: {}'.format(i+1, p) for i, p in enumerate(self.planes)]
+        ret += '\n'.join(temp)
+        return ret
+
+
+class Parametrization(object):
+    """Solution set basepoint + t_1 * d_1 + ... + t_k * d_k of a system with
+    infinitely many solutions"""
+
+    BASEPT_AND_DIR_VECTORS_MUST_BE_IN_SAME_DIM_MSG = (
+        'The basepoint and direction vectors should all live in the same dimension')
+
+    def __init__(self, basepoint, direction_vectors):
+        self.basepoint = basepoint
+        self.direction_vectors = direction_vectors
+        self.dimension = basepoint.dimension
+
+        for v in direction_vectors:
+            if v.dimension != self.dimension:
+                raise Exception(self.BASEPT_AND_DIR_VECTORS_MUST_BE_IN_SAME_DIM_MSG)
+
+    def __str__(self):
+        """writes one line x_i = b_i + c_1 t_1 + ... per variable """
+
+        num_decimal_places = 3
+        output = ''
+        for coord in range(self.dimension):
+            output += 'x_{} = {} '.format(
+                coord + 1, round(self.basepoint[coord], num_decimal_places))
+            for free_var, vector in enumerate(self.direction_vectors):
+                output += '+ {} t_{}'.format(
+                    round(vector[coord], num_decimal_places), free_var + 1)
+            output += '\n'
+        return output
+
+
+def _row_scales(rows, dimension):
+    """Returns (largest |coefficient|, largest |number|) of every row, as
+    floats"""
+
+    scales = []
+    for row in rows:
+        coefficient_scale = float(max(abs(x) for x in row[:dimension]))
+        scales.append((coefficient_scale, max(coefficient_scale, float(abs(row[-1])))))
+    return scales
+
+
+def _row_reduce_rows(rows, scales, dimension, tolerance, reduced, zero):
+    """Gaussian elimination with scaled partial pivoting on a list of row
+    lists, in place; scales are swapped along with their rows. Entries
+    within tolerance of zero relative to their row are set to zero.
+    Returns the pivot columns of the leading rows"""
+
+    def scaled(r):
+        coefficient_scale = scales[r][0]
+        if not coefficient_scale:
+            return 0.0
+        return float(abs(rows[r][col])) / coefficient_scale
+
+    pivots = []
+    row = 0
+    for col in range(dimension):
+        if row == len(rows):
+            break
+
+        best = max(range(row, len(rows)), key=scaled)
+        if scaled(best) <= tolerance:
+            for r in range(row, len(rows)):
+                rows[r][col] = zero
+            continue
+        rows[row], rows[best] = rows[best], rows[row]
+        scales[row], scales[best] = scales[best], scales[row]
+
+        pivot_row = rows[row]
+        if reduced:
+            pivot = pivot_row[col]
+            pivot_row[col:] = [x / pivot for x in pivot_row[col:]]
+
+        targets = range(len(rows)) if reduced else range(row + 1, len(rows))
+        for r in targets:
+            if r == row:
+                continue
+            target = rows[r]
+            factor = target[col] / pivot_row[col]
+            if factor == 0:
+                continue
+            for j in range(col + 1, dimension + 1):
+                target[j] -= factor * pivot_row[j]
+            target[col] = zero
+
+        pivots.append(col)
+        row += 1
+
+    return pivots
+
+
+def _row_reduce_array(rows, scales, dimension, tolerance, reduced):
+    """Same elimination as _row_reduce_rows on a float64 array, updating all
+    target rows of a pivot with one outer product"""
+
+    import numpy as np
+
+    m = np.array(rows, dtype=np.float64)
+    coefficient_scales = np.array([s[0] for s in scales])
+    with np.errstate(divide='ignore'):
+        inverse_scales = np.where(coefficient_scales > 0, 1.0 / coefficient_scales, 0.0)
+
+    pivots = []
+    row = 0
+    for col in range(dimension):
+        if row == m.shape[0]:
+            break
+
+        scaled = np.abs(m[row:, col]) * inverse_scales[row:]
+        best = row + int(np.argmax(scaled))
+        if scaled[best - row] <= tolerance:
+            m[row:, col] = 0.0
+            continue
+        if best != row:
+            m[[row, best]] = m[[best, row]]
+            inverse_scales[[row, best]] = inverse_scales[[best, row]]
+            scales[row], scales[best] = scales[best], scales[row]
+
+        if reduced:
+            m[row, col:] /= m[row, col]
+
+        targets = [slice(row + 1, None)]
+        if reduced:
+            targets.append(slice(0, row))
+        for target in targets:
+            factors = m[target, col] / m[row, col]
+            m[target, col:] -= np.outer(factors, m[row, col:])
+            m[target, col] = 0.0
+
+        pivots.append(col)
+        row += 1
+
+    return m.tolist(), pivots
+
+
+def main():
+    """ solves the quiz systems of planes """
+    p1 = Plane(normal_vector=Vector(['5.862', '1.178', '-10.366']), constant_term='-8.15')
+    p2 = Plane(normal_vector=Vector(['-2.931', '-0.589', '5.183']), constant_term='-4.075')
+    s = LinearSystem([p1, p2])
+    try:
+        s.compute_solution()
+    except Exception as e:
+        # should print No solutions
+        print(e)
+
+    p1 = Plane(normal_vector=Vector(['8.631', '5.112', '-1.816']), constant_term='-5.113')
+    p2 = Plane(normal_vector=Vector(['4.315', '11.132', '-5.27']), constant_term='-6.775')
+    p3 = Plane(normal_vector=Vector(['-2.158', '3.01', '-1.727']), constant_term='-0.831')
+    s = LinearSystem([p1, p2, p3])
+    # should print a parametrization with one free variable
+    print(s.compute_solution())
+
+    p1 = Plane(normal_vector=Vector(['5.262', '2.739', '-9.878']), constant_term='-3.441')
+    p2 = Plane(normal_vector=Vector(['5.111', '6.358', '7.638']), constant_term='-2.152')
+    p3 = Plane(normal_vector=Vector(['2.016', '-9.924', '-1.367']), constant_term='-9.278')
+    p4 = Plane(normal_vector=Vector(['2.167', '-13.543', '-18.883']), constant_term='-10.567')
+    s = LinearSystem([p1, p2, p3, p4])
+    # should print coordinates: [-1.177, 0.707, -0.083]
+    print(s.compute_solution())
+
+    # badly scaled equations: should print coordinates (0.1, 200) twice
+    for backend in ('decimal', 'float'):
+        p1 = Plane(normal_vector=Vector(['10', '0'], backend), constant_term='1')
+        p2 = Plane(normal_vector=Vector(['0', '0.005'], backend), constant_term='1')
+        print(LinearSystem([p1, p2]).compute_solution())
+
+
+if __name__ == '__main__':
+    main()
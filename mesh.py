@@ -0,0 +1,157 @@
+import numpy as np
+
+from vector_batch import VectorBatch, as_coordinate_array
+
+
+def as_face_array(faces, vertex_count=None):
+    """Returns a triangle index buffer as an F x 3 integer array.
+
+    faces may be any F x 3 sequence, or a flat buffer of 3F indices; an
+    empty one gives a 0 x 3 array. When vertex_count is given, indices outside [0, vertex_count) are rejected."""
+
+    array = np.asarray(faces)
+    if not array.size:
+        return np.empty((0, 3), dtype=np.intp)
+    if array.dtype.kind not in 'iu':
+        raise TypeError('The faces must be integer vertex indices')
+    if array.ndim == 1 and len(array) % 3 == 0:
+        array = array.reshape(-1, 3)
+    if array.ndim != 2 or array.shape[1] != 3:
+        raise ValueError('The faces must be an F x 3 array of vertex indices')
+
+    if vertex_count is not None and len(array):
+        if array.min() < 0 or array.max() >= vertex_count:
+            raise IndexError('Face indices must be in [0, {})'.format(vertex_count))
+    return array
+
+
+def face_cross_products(vertices, faces):
+    """Returns (b - a) x (c - a) for every triangle (a, b, c) as an F x 3
+    array, the per-face find_cross_product_of in one pass.
+
+    Each row points along the face normal and has length twice the
+    triangle's area. vertices may be a V x 3 array, a VectorBatch or a list
+    of Vectors."""
+
+    return np.ascontiguousarray(_cross_columns(vertices, faces).T)
+
+
+def face_areas(vertices, faces, cross=None):
+    """Returns the area of every triangle, as find_triangle_area_of does for
+    one. cross may pass in face_cross_products already computed"""
+
+    columns = _columns_of(vertices, faces, cross)
+    return 0.5 * _column_magnitudes(columns)
+
+
+def surface_area(vertices, faces):
+    """Returns the total area of all triangles of the mesh """
+
+    return float(face_areas(vertices, faces).sum())
+
+
+def face_normals(vertices, faces, cross=None):
+    """Returns the unit normal of every triangle as a VectorBatch, following
+    the right-hand rule on the vertex order. Degenerate triangles with no
+    area get a zero normal"""
+
+    columns = _columns_of(vertices, faces, cross)
+    return VectorBatch(_normalized_rows_of(columns))
+
+
+def vertex_normals(vertices, faces, cross=None):
+    """Returns a unit normal per vertex as a VectorBatch: the sum of the
+    normals of the faces around it, each weighted by the face's area.
+
+    The cross products are already area weighted, so they are summed
+    directly. Vertices used by no face, or whose faces cancel out, get a
+    zero normal."""
+
+    vertices = as_coordinate_array(vertices)
+    faces = as_face_array(faces, len(vertices))
+    columns = _columns_of(vertices, faces, cross)
+
+    count = len(vertices)
+    sums = np.zeros((3, count))
+    for corner in range(3):
+        # every face adds its cross product to each of its three vertices
+        corner_indices = np.ascontiguousarray(faces[:, corner])
+        for axis in range(3):
+            sums[axis] += np.bincount(corner_indices, weights=columns[axis],
+                                      minlength=count)
+    return VectorBatch(_normalized_rows_of(sums))
+
+
+def _cross_columns(vertices, faces):
+    """Returns the face cross products as a 3 x F array.
+
+    Each coordinate is gathered and combined as its own contiguous array,
+    which touches memory far less than gathering F x 3 rows and slicing
+    their columns."""
+
+    vertices = as_coordinate_array(vertices)
+    if vertices.shape[1] != 3:
+        raise ValueError('Mesh vertices must be 3-d')
+    faces = as_face_array(faces, len(vertices))
+
+    x, y, z = np.ascontiguousarray(vertices.T)
+    i, j, k = np.ascontiguousarray(faces.T)
+
+    ax, ay, az = x[i], y[i], z[i]
+    ux, uy, uz = x[j] - ax, y[j] - ay, z[j] - az
+    vx, vy, vz = x[k] - ax, y[k] - ay, z[k] - az
+    del ax, ay, az
+
+    columns = np.empty((3, len(faces)))
+    np.multiply(uy, vz, out=columns[0])
+    columns[0] -= uz * vy
+    np.multiply(uz, vx, out=columns[1])
+    columns[1] -= ux * vz
+    np.multiply(ux, vy, out=columns[2])
+    columns[2] -= uy * vx
+    return columns
+
+
+def _columns_of(vertices, faces, cross):
+    if cross is None:
+        return _cross_columns(vertices, faces)
+    return np.asarray(cross, dtype=np.float64).T
+
+
+def _column_magnitudes(columns):
+    x, y, z = columns
+    return np.sqrt(x * x + y * y + z * z)
+
+
+def _normalized_rows_of(columns):
+    """Returns the 3 x N columns as N x 3 unit rows, zero rows staying zero"""
+
+    magnitudes = _column_magnitudes(columns)
+    magnitudes[magnitudes == 0] = 1.0
+    rows = np.empty((columns.shape[1], 3))
+    for axis in range(3):
+        np.divide(columns[axis], magnitudes, out=rows[:, axis])
+    return rows
+
+
+def main():
+    """ unit cube made of 12 triangles """
+    vertices = [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+                [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]]
+    faces = [[0, 2, 1], [0, 3, 2], [4, 5, 6], [4, 6, 7],
+             [0, 1, 5], [0, 5, 4], [1, 2, 6], [1, 6, 5],
+             [2, 3, 7], [2, 7, 6], [3, 0, 4], [3, 4, 7]]
+
+    # should print 6.0
+    print(surface_area(vertices, faces))
+
+    # should print the outward normals of the two bottom and two top faces
+    print(face_normals(vertices, faces)[0:4])
+
+    # should print the corner normal (-0.333, -0.667, -0.667): two bottom and
+    # two front triangles meet at vertex 0 but only one left triangle does
+    print(vertex_normals(vertices, faces)[0])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+from math import sqrt, acos
+from decimal import Decimal, Context, getcontext, setcontext
+from fractions import Fraction
+from contextlib import contextmanager
+from functools import wraps
+import threading
+
+DEFAULT_PRECISION = 7
+
+
+class FloatBackend(object):
+    """Native float arithmetic, the fast path"""
+
+    name = 'float'
+    context = None
+
+    def __reduce__(self):
+        return (get_backend, (self.name,))
+
+    def convert(self, x):
+        return float(x)
+
+    def sqrt(self, x):
+        return sqrt(x)
+
+    def acos(self, x):
+        return acos(x)
+
+    def epsilon(self):
+        """Returns the relative rounding error of one operation"""
+        return 2.0 ** -52
+
+
+class DecimalBackend(object):
+    """Decimal arithmetic; square roots are taken in Decimal as well, with
+    guard digits so a magnitude is not rounded before it is used.
+
+    With a precision the backend owns a decimal Context, and methods
+    decorated with in_backend_context do their arithmetic in it instead of
+    the thread's global context. Without one they use the global context."""
+
+    GUARD_DIGITS = 9
+
+    name = 'decimal'
+
+    def __init__(self, prec=None):
+        self.prec = prec
+        self.context = Context(prec=prec) if prec else None
+
+    def __reduce__(self):
+        return (decimal_backend, (self.prec,))
+
+    def convert(self, x):
+        if isinstance(x, Fraction):
+            return Decimal(x.numerator) / Decimal(x.denominator)
+        return Decimal(x)
+
+    def sqrt(self, x):
+        context = (self.context or getcontext()).copy()
+        context.prec += self.GUARD_DIGITS
+        return Decimal(x).sqrt(context)
+
+    def acos(self, x):
+        return Decimal(acos(x))
+
+    def epsilon(self):
+        prec = (self.context or getcontext()).prec
+        return 10.0 ** (1 - prec)
+
+
+class FractionBackend(object):
+    """Exact rational arithmetic. Floats are read through their shortest
+    repr, so 0.1 becomes 1/10. Square roots of non-square rationals and
+    arc cosines cannot be exact and are rounded through float"""
+
+    name = 'fraction'
+    context = None
+
+    def __reduce__(self):
+        return (get_backend, (self.name,))
+
+    def convert(self, x):
+        if isinstance(x, float):
+            return Fraction(repr(x))
+        return Fraction(x)
+
+    def sqrt(self, x):
+        x = Fraction(x)
+        numerator = _exact_isqrt(x.numerator)
+        denominator = _exact_isqrt(x.denominator)
+        if numerator is not None and denominator is not None:
+            return Fraction(numerator, denominator)
+        return self.convert(sqrt(x))
+
+    def acos(self, x):
+        return self.convert(acos(x))
+
+    def epsilon(self):
+        return 0.0
+
+
+FLOAT = FloatBackend()
+DECIMAL = DecimalBackend(DEFAULT_PRECISION)
+FRACTION = FractionBackend()
+
+_decimal_backends = {DEFAULT_PRECISION: DECIMAL}
+
+BACKENDS = {
+    FLOAT.name: FLOAT,
+    DECIMAL.name: DECIMAL,
+    FRACTION.name: FRACTION,
+}
+
+_scope = threading.local()
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+
+def get_backend(backend=None):
+    """Returns a backend object.
+
+    backend may be a backend instance, one of the names 'float', 'decimal'
+    or 'fraction', or None for the backend of the current scope."""
+
+    if backend is None:
+        stack = getattr(_scope, 'stack', None)
+        if stack:
+            return stack[-1]
+        return DECIMAL
+    if isinstance(backend, string_types):
+        try:
+            return BACKENDS[backend]
+        except KeyError:
+            raise ValueError('Unknown numeric backend: {}'.format(backend))
+    return backend
+
+
+def decimal_backend(prec=None):
+    """Returns the shared DecimalBackend for a precision. prec=None gives a
+    backend that follows the thread's global decimal context"""
+
+    backend = _decimal_backends.get(prec)
+    if backend is None:
+        backend = _decimal_backends.setdefault(prec, DecimalBackend(prec))
+    return backend
+
+
+@contextmanager
+def use_backend(backend):
+    """Makes backend the default for objects created inside the with block"""
+
+    backend = get_backend(backend)
+    stack = getattr(_scope, 'stack', None)
+    if stack is None:
+        stack = _scope.stack = []
+    stack.append(backend)
+    try:
+        yield backend
+    finally:
+        stack.pop()
+
+
+def precision(prec):
+    """Context manager making Decimal with prec significant digits the
+    default backend inside the with block, e.g.
+
+        with precision(30):
+            v = Vector(['1', '2'])    # computes with 30 digits
+
+    It only affects objects created inside the block, and leaves the
+    global decimal context alone."""
+
+    return use_backend(decimal_backend(prec))
+
+
+def in_backend_context(method):
+    """Decorates a method of an object with a backend attribute so its
+    arithmetic runs in the backend's decimal context, if it has one"""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        context = self.backend.context
+        if context is None:
+            return method(self, *args, **kwargs)
+
+        previous = getcontext()
+        if previous is context:
+            return method(self, *args, **kwargs)
+
+        setcontext(context)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            setcontext(previous)
+
+    return wrapper
+
+
+def backend_of(value, backend=None):
+    """Returns backend if given, else the backend value was built with, else
+    the backend of the current scope"""
+
+    if backend is None and value is not None:
+        return value.backend
+    return get_backend(backend)
+
+
+def is_near_zero(value, eps=1e-10):
+    """Returns True if a number of any backend is within eps of zero"""
+
+    return abs(value) < eps
+
+
+def _exact_isqrt(n):
+    """Returns the integer square root of n if n is a perfect square"""
+
+    if n < 0:
+        return None
+    if n < 2:
+        return n
+
+    # Newton's method on integers, so large numerators do not overflow float
+    root = n
+    next_root = (root + n // root) // 2
+    while next_root < root:
+        root = next_root
+        next_root = (root + n // root) // 2
+
+    if root * root == n:
+        return root
+    return None
@@ -0,0 +1,126 @@
+import numpy as np
+
+from canonical import DEFAULT_TOLERANCE
+from vector_batch import as_coordinate_array
+
+# rows and columns per tile; a 1024 x 1024 float64 tile is 8 MB
+DEFAULT_TILE_SIZE = 1024
+
+
+def iter_gram_tiles(a, b=None, tile_size=DEFAULT_TILE_SIZE):
+    """Yields (row_start, col_start, tile) covering the matrix of dot
+    products a[i].b[j], one tile_size x tile_size block at a time.
+
+    a and b are VectorBatches, arrays or lists of Vectors; b defaults to a.
+    Only one tile is held in memory, so N x N results for large N can be
+    reduced or written out as they are produced."""
+
+    a, b = _as_matrices(a, b)
+    for row_start in range(0, len(a), tile_size):
+        rows = a[row_start:row_start + tile_size]
+        for col_start in range(0, len(b), tile_size):
+            yield row_start, col_start, rows.dot(b[col_start:col_start + tile_size].T)
+
+
+def iter_angle_tiles(a, b=None, in_degrees=False, tile_size=DEFAULT_TILE_SIZE):
+    """Yields tiles of the angles between a[i] and b[j], in radians or
+    degrees. Angles involving a zero vector, shorter than 1e-10 as in
+    Vector.is_zero, are NaN"""
+
+    for row_start, col_start, cosines in _iter_cosine_tiles(a, b, tile_size):
+        angles = np.arccos(np.clip(cosines, -1.0, 1.0))
+        if in_degrees:
+            angles = np.degrees(angles)
+        yield row_start, col_start, angles
+
+
+def iter_orthogonal_tiles(a, b=None, tolerance=1e-10, tile_size=DEFAULT_TILE_SIZE):
+    """Yields boolean tiles, True where |a[i].b[j]| < tolerance as in
+    Vector.is_orthogonal_to"""
+
+    for row_start, col_start, tile in iter_gram_tiles(a, b, tile_size):
+        yield row_start, col_start, np.abs(tile) < tolerance
+
+
+def iter_parallel_tiles(a, b=None, tolerance=1e-10, tile_size=DEFAULT_TILE_SIZE):
+    """Yields boolean tiles, True where a[i] and b[j] are parallel or
+    either is a zero vector, as in Vector.is_parallel_to.
+
+    Vectors count as parallel when 1 - |cos| <= tolerance. This is about
+    angle**2 / 2, so float rounding of exactly parallel vectors stays well
+    inside the default tolerance."""
+
+    for row_start, col_start, cosines in _iter_cosine_tiles(a, b, tile_size):
+        with np.errstate(invalid='ignore'):
+            parallel = 1.0 - np.abs(cosines) <= tolerance
+        yield row_start, col_start, parallel | np.isnan(cosines)
+
+
+def gram_matrix(a, b=None, tile_size=DEFAULT_TILE_SIZE, out=None):
+    """Returns the matrix of dot products a[i].b[j].
+
+    out may be a preallocated array, e.g. a numpy memmap on disk when the
+    result does not fit in memory; it is filled one tile at a time."""
+
+    a, b = _as_matrices(a, b)
+    return _fill(iter_gram_tiles(a, b, tile_size), a, b, np.float64, out)
+
+
+def angle_matrix(a, b=None, in_degrees=False, tile_size=DEFAULT_TILE_SIZE, out=None):
+    """Returns the matrix of angles between a[i] and b[j] """
+
+    a, b = _as_matrices(a, b)
+    return _fill(iter_angle_tiles(a, b, in_degrees, tile_size), a, b, np.float64, out)
+
+
+def orthogonal_mask(a, b=None, tolerance=1e-10, tile_size=DEFAULT_TILE_SIZE, out=None):
+    """Returns a boolean matrix, True where a[i] is orthogonal to b[j] """
+
+    a, b = _as_matrices(a, b)
+    return _fill(iter_orthogonal_tiles(a, b, tolerance, tile_size), a, b, np.bool_, out)
+
+
+def parallel_mask(a, b=None, tolerance=1e-10, tile_size=DEFAULT_TILE_SIZE, out=None):
+    """Returns a boolean matrix, True where a[i] is parallel to b[j] """
+
+    a, b = _as_matrices(a, b)
+    return _fill(iter_parallel_tiles(a, b, tolerance, tile_size), a, b, np.bool_, out)
+
+
+def _iter_cosine_tiles(a, b, tile_size):
+    """Yields tiles of cosines, computing every vector's magnitude once"""
+
+    a, b = _as_matrices(a, b)
+    inverse_a = _inverse_magnitudes(a)
+    inverse_b = inverse_a if b is a else _inverse_magnitudes(b)
+
+    for row_start, col_start, tile in iter_gram_tiles(a, b, tile_size):
+        tile *= inverse_a[row_start:row_start + tile.shape[0], np.newaxis]
+        tile *= inverse_b[np.newaxis, col_start:col_start + tile.shape[1]]
+        yield row_start, col_start, tile
+
+
+def _inverse_magnitudes(matrix):
+    magnitudes = np.sqrt(np.einsum('ij,ij->i', matrix, matrix))
+    with np.errstate(divide='ignore'):
+        inverse = 1.0 / magnitudes
+    inverse[magnitudes < DEFAULT_TOLERANCE] = np.nan
+    return inverse
+
+
+def _as_matrices(a, b):
+    a = as_coordinate_array(a)
+    return a, (a if b is None else as_coordinate_array(b))
+
+
+def _fill(tiles, a, b, dtype, out):
+    shape = (len(a), len(b))
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape:
+        raise ValueError('out must have shape {}'.format(shape))
+
+    for row_start, col_start, tile in tiles:
+        out[row_start:row_start + tile.shape[0],
+            col_start:col_start + tile.shape[1]] = tile
+    return out
@@ -0,0 +1,104 @@
+import multiprocessing
+
+from vectors_final import Vector
+from line_intersections import Line
+from planes import Plane
+
+# smallest number of items sent to a worker at once; smaller chunks spend
+# more time pickling and messaging than computing
+MIN_CHUNK_SIZE = 2000
+
+# chunks per process, so a slow chunk does not leave the other cores idle
+CHUNKS_PER_PROCESS = 4
+
+
+def parallel_map(function, items, processes=None, chunk_size=None):
+    """Applies function to every item on a process pool and returns the
+    results in input order.
+
+    Items are sent in chunks of chunk_size (by default enough for about
+    CHUNKS_PER_PROCESS chunks per process, and at least MIN_CHUNK_SIZE).
+    function and the items must be picklable; function must be defined at
+    module level. With processes=1, or too few items for two chunks, the
+    work runs in this process without a pool."""
+
+    items = list(items)
+    processes = processes or multiprocessing.cpu_count()
+    if chunk_size is None:
+        chunk_size = max(MIN_CHUNK_SIZE,
+                         -(-len(items) // (processes * CHUNKS_PER_PROCESS)))
+
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    if processes == 1 or len(chunks) < 2:
+        return [function(item) for item in items]
+
+    pool = multiprocessing.Pool(min(processes, len(chunks)))
+    try:
+        chunk_results = pool.map(_apply_to_chunk,
+                                 [(function, chunk) for chunk in chunks])
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    results = []
+    for chunk_result in chunk_results:
+        results.extend(chunk_result)
+    return results
+
+
+def map_intersection_with(pairs, processes=None, chunk_size=None):
+    """Returns line1.intersection_with(line2) for every (line1, line2) pair
+    of line_intersections.Line objects, computed on a process pool"""
+
+    encoded = [(_encode(l1), _encode(l2)) for l1, l2 in pairs]
+    return parallel_map(_intersection_job, encoded, processes, chunk_size)
+
+
+def map_is_parallel_with(pairs, processes=None, chunk_size=None):
+    """Returns plane1.is_parallel_with(plane2) for every pair of Planes,
+    computed on a process pool"""
+
+    encoded = [(_encode(p1), _encode(p2)) for p1, p2 in pairs]
+    return parallel_map(_is_parallel_job, encoded, processes, chunk_size)
+
+
+def map_plane_eq(pairs, processes=None, chunk_size=None):
+    """Returns plane1 == plane2 for every pair of Planes, computed on a
+    process pool"""
+
+    encoded = [(_encode(p1), _encode(p2)) for p1, p2 in pairs]
+    return parallel_map(_equal_job, encoded, processes, chunk_size)
+
+
+def _apply_to_chunk(job):
+    function, chunk = job
+    return [function(item) for item in chunk]
+
+
+def _encode(equation):
+    """Reduces a Line or Plane to plain data that pickles compactly; the
+    shared backend object is only written once per chunk"""
+
+    return (equation.normal_vector.coordinates, equation.constant_term,
+            equation.backend)
+
+
+def _decode(cls, encoded):
+    coordinates, constant_term, backend = encoded
+    normal_vector = Vector._from_backend_values(coordinates, backend)
+    return cls(normal_vector, constant_term, backend)
+
+
+def _intersection_job(pair):
+    return _decode(Line, pair[0]).intersection_with(_decode(Line, pair[1]))
+
+
+def _is_parallel_job(pair):
+    return _decode(Plane, pair[0]).is_parallel_with(_decode(Plane, pair[1]))
+
+
+def _equal_job(pair):
+    return _decode(Plane, pair[0]) == _decode(Plane, pair[1])
@@ -0,0 +1,125 @@
+import numpy as np
+
+from hyperplane_batch import hyperplanes_to_arrays
+from planes import Plane
+from vectors_final import Vector
+
+
+def planes_to_arrays(planes):
+    """Returns the normal vectors (N x d) and constant terms (N) of a
+    sequence of Plane objects as float64 arrays"""
+
+    return hyperplanes_to_arrays(planes)
+
+
+def canonicalize_planes(normals, constants, tolerance=1e-10):
+    """Scales every plane n.x = k to unit normal length and flips its sign so
+    the first nonzero normal coordinate is positive.
+
+    Two planes are then parallel exactly when their canonical normals are
+    equal, and the same plane when the canonical constants are equal too.
+    Planes whose normal is within tolerance of zero are left unchanged."""
+
+    normals = np.asarray(normals, dtype=np.float64)
+    constants = np.asarray(constants, dtype=np.float64).reshape(-1)
+
+    magnitudes = np.sqrt(np.einsum('ij,ij->i', normals, normals))
+    zero = magnitudes < tolerance
+
+    scale = np.ones_like(magnitudes)
+    scale[~zero] = 1.0 / magnitudes[~zero]
+
+    nonzero_coordinates = np.abs(normals) * scale[:, np.newaxis] > tolerance
+    first = np.argmax(nonzero_coordinates, axis=1)
+    signs = np.sign(normals[np.arange(len(normals)), first])
+    signs[zero | (signs == 0)] = 1.0
+    scale *= signs
+
+    return normals * scale[:, np.newaxis], constants * scale
+
+
+def group_plane_arrays(normals, constants, tolerance=1e-10):
+    """Groups N planes given as arrays into parallel families and coincident
+    classes by sorting their canonical forms, in O(N log N).
+
+    Returns (parallel_labels, coincident_labels): planes i and j are
+    parallel when parallel_labels[i] == parallel_labels[j], and the same
+    plane when coincident_labels[i] == coincident_labels[j]. Labels are
+    numbered from 0 in the sorted order of the canonical forms. All planes
+    with a zero normal vector form one family.
+
+    Canonical coordinates are snapped to a grid of size tolerance before
+    comparing, so planes that agree within tolerance normally share a
+    label; two values on either side of a grid line can still be split."""
+
+    if len(constants) == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    canonical_normals, canonical_constants = canonicalize_planes(
+        normals, constants, tolerance)
+
+    normal_keys = np.round(canonical_normals / tolerance)
+    constant_keys = np.round(canonical_constants / tolerance)
+
+    parallel_labels = _labels_of_rows(normal_keys)
+    coincident_labels = _labels_of_rows(
+        np.column_stack((normal_keys, constant_keys)))
+    return parallel_labels, coincident_labels
+
+
+def group_planes(planes, tolerance=1e-10):
+    """Groups Plane objects into parallel families and coincident classes.
+    Returns the two label arrays described in group_plane_arrays"""
+
+    normals, constants = planes_to_arrays(planes)
+    return group_plane_arrays(normals, constants, tolerance)
+
+
+def groups_from_labels(labels):
+    """Returns a list of index arrays, one per distinct label """
+
+    if len(labels) == 0:
+        return []
+    order = np.argsort(labels, kind='mergesort')
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    return np.split(order, boundaries)
+
+
+def _labels_of_rows(keys):
+    """Numbers the distinct rows of keys, sorting them lexicographically"""
+
+    keys = np.ascontiguousarray(keys)
+    order = np.lexsort(keys.T[::-1])
+    sorted_keys = keys[order]
+    starts = np.ones(len(keys), dtype=bool)
+    starts[1:] = np.any(sorted_keys[1:] != sorted_keys[:-1], axis=1)
+
+    labels = np.empty(len(keys), dtype=np.intp)
+    labels[order] = np.cumsum(starts) - 1
+    return labels
+
+
+def main():
+    """ groups the plane quiz pairs """
+    planes = [
+        Plane(normal_vector=Vector([-0.412, 3.806, 0.728]), constant_term=-3.46),
+        Plane(normal_vector=Vector([1.03, -9.515, -1.82]), constant_term=8.65),
+        Plane(normal_vector=Vector([2.611, 5.528, 0.283]), constant_term=4.6),
+        Plane(normal_vector=Vector([7.926, 8.306, 5.342]), constant_term=3.76),
+        Plane(normal_vector=Vector([-7.926, 8.625, -7.212]), constant_term=7.952),
+        Plane(normal_vector=Vector([-2.642, 2.875, -2.404]), constant_term=-2.443),
+    ]
+    parallel_labels, coincident_labels = group_planes(planes, tolerance=1e-6)
+
+    # should print [[0, 1], [2], [3], [4, 5]] in some order
+    print([indices.tolist() for indices in groups_from_labels(parallel_labels)])
+
+    # should print [[0, 1], [2], [3], [4], [5]] in some order
+    print([indices.tolist() for indices in groups_from_labels(coincident_labels)])
+
+    # should print [] for no planes
+    print(groups_from_labels(group_planes([])[0]))
+
+
+if __name__ == '__main__':
+    main()
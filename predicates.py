@@ -0,0 +1,207 @@
+"""Exact geometric predicates with a fast float filter.
+
+Each predicate first evaluates its expression in float arithmetic along
+with a bound on the rounding error. When the float result is further from
+zero than the bound, its sign is certain and is returned. Only when it is
+not does the predicate redo the computation exactly with Fractions, so
+the answer is always the exact one for the stored coordinates of any
+backend (float, Decimal or Fraction), at float speed in the common case.
+
+Inside a use_exact_predicates() block, Vector.is_parallel_to,
+Vector.is_orthogonal_to and the __eq__ of Line and Plane answer with these
+predicates instead of their tolerances."""
+
+from contextlib import contextmanager
+from fractions import Fraction
+import threading
+
+# twice the unit roundoff of a float operation
+EPSILON = 2.0 ** -52
+
+# below this the error bounds could be broken by underflow, so the exact
+# computation is used
+TINY = 2.0 ** -900
+
+_state = threading.local()
+
+
+@contextmanager
+def use_exact_predicates(enabled=True):
+    """Makes Vector, Line and Plane comparisons made inside the with block
+    use the exact predicates of this module"""
+
+    previous = exact_predicates_enabled()
+    _state.enabled = enabled
+    try:
+        yield
+    finally:
+        _state.enabled = previous
+
+
+def exact_predicates_enabled():
+    return getattr(_state, 'enabled', False)
+
+
+def sign_of_dot_product(u, v):
+    """Returns -1, 0 or 1, the sign of the exact dot product u.v """
+
+    u, v = _coordinates_of_pair(u, v)
+    fu, fv = _floats(u), _floats(v)
+
+    products = [x * y for x, y in zip(fu, fv)]
+    total = sum(products)
+    bound = (len(u) + 3) * EPSILON * sum(abs(p) for p in products)
+    sign = _filtered_sign(total, bound)
+    if sign is not None:
+        return sign
+    return _sign(sum(x * y for x, y in zip(_fractions(u), _fractions(v))))
+
+
+def is_orthogonal(u, v):
+    """Tests if the exact dot product of u and v is zero """
+
+    return sign_of_dot_product(u, v) == 0
+
+
+def is_parallel(u, v):
+    """Tests if u and v are exactly parallel, i.e. every 2 x 2 minor
+    u[i]*v[j] - u[j]*v[i] is zero. A zero vector is parallel to every
+    vector, as in Vector.is_parallel_to"""
+
+    u, v = _coordinates_of_pair(u, v)
+    fu, fv = _floats(u), _floats(v)
+
+    # u is parallel to v iff the minors against one nonzero coordinate of u
+    # vanish; the largest one keeps the float minors well conditioned
+    k = max(range(len(fu)), key=lambda i: abs(fu[i]))
+    if fu[k] == 0:
+        return _is_parallel_exact(_fractions(u), _fractions(v))
+
+    undecided = []
+    for i in range(len(fu)):
+        if i == k:
+            continue
+        a, b = fu[k] * fv[i], fu[i] * fv[k]
+        if _filtered_sign(a - b, 6 * EPSILON * (abs(a) + abs(b))) is None:
+            undecided.append(i)
+        else:
+            return False
+
+    if undecided:
+        qu, qv = _fractions(u), _fractions(v)
+        return all(qu[k] * qv[i] == qu[i] * qv[k] for i in undecided)
+    return True
+
+
+def orientation(p, q, r):
+    """Returns 1 if the 2-d points p, q, r turn left (counterclockwise), -1
+    if they turn right and 0 if they are collinear"""
+
+    p, q, r = [_coordinates_of(x) for x in (p, q, r)]
+    (px, py), (qx, qy), (rx, ry) = _floats(p), _floats(q), _floats(r)
+
+    left = (qx - px) * (ry - py)
+    right = (qy - py) * (rx - px)
+    # error terms scale with the coordinates, not their differences,
+    # because converted inputs carry their own rounding
+    permanent = ((abs(qx) + abs(px)) * (abs(ry) + abs(py)) +
+                 (abs(qy) + abs(py)) * (abs(rx) + abs(px)))
+    sign = _filtered_sign(left - right, 8 * EPSILON * permanent)
+    if sign is not None:
+        return sign
+
+    (px, py), (qx, qy), (rx, ry) = _fractions(p), _fractions(q), _fractions(r)
+    return _sign((qx - px) * (ry - py) - (qy - py) * (rx - px))
+
+
+def orientation_3d(a, b, c, d):
+    """Returns 1 if d lies on the side of the plane through the 3-d points
+    a, b, c that (b - a) x (c - a) points to, -1 if on the other side and
+    0 if the four points are coplanar"""
+
+    points = [_coordinates_of(x) for x in (a, b, c, d)]
+    floats = [_floats(x) for x in points]
+    rows = [[x - y for x, y in zip(floats[i], floats[0])] for i in (1, 2, 3)]
+    sizes = [[abs(x) + abs(y) for x, y in zip(floats[i], floats[0])]
+             for i in (1, 2, 3)]
+
+    determinant = _det3(rows)
+    sign = _filtered_sign(determinant, 16 * EPSILON * _permanent3(sizes))
+    if sign is not None:
+        return sign
+
+    exact = [_fractions(x) for x in points]
+    rows = [[x - y for x, y in zip(exact[i], exact[0])] for i in (1, 2, 3)]
+    return _sign(_det3(rows))
+
+
+def are_coincident(normal1, constant1, normal2, constant2):
+    """Tests if the lines or planes n1.x = k1 and n2.x = k2 are exactly the
+    same, i.e. (n1, k1) is a nonzero multiple of (n2, k2).
+
+    When both normal vectors are zero the equations are compared by their
+    constants, as Line.__eq__ and Plane.__eq__ do."""
+
+    n1, n2 = _coordinates_of_pair(normal1, normal2)
+    zero1 = not any(n1)
+    zero2 = not any(n2)
+    if zero1 or zero2:
+        return zero1 and zero2 and Fraction(constant1) == Fraction(constant2)
+
+    return is_parallel(list(n1) + [constant1], list(n2) + [constant2])
+
+
+def _filtered_sign(value, bound):
+    """Returns the sign of value if the error bound makes it certain, else
+    None"""
+
+    if bound < TINY or not (abs(value) < float('inf')):
+        return None
+    if value > bound:
+        return 1
+    if value < -bound:
+        return -1
+    return None
+
+
+def _is_parallel_exact(u, v):
+    nonzero = [i for i, x in enumerate(u) if x != 0]
+    if not nonzero:
+        return True
+    k = nonzero[0]
+    return all(u[k] * v[i] == u[i] * v[k] for i in range(len(u)))
+
+
+def _det3(m):
+    return (m[0][0] * (m[1][1] * m[2][2] - m[1][2] * m[2][1]) -
+            m[0][1] * (m[1][0] * m[2][2] - m[1][2] * m[2][0]) +
+            m[0][2] * (m[1][0] * m[2][1] - m[1][1] * m[2][0]))
+
+
+def _permanent3(m):
+    return (m[0][0] * (m[1][1] * m[2][2] + m[1][2] * m[2][1]) +
+            m[0][1] * (m[1][0] * m[2][2] + m[1][2] * m[2][0]) +
+            m[0][2] * (m[1][0] * m[2][1] + m[1][1] * m[2][0]))
+
+
+def _sign(x):
+    return (x > 0) - (x < 0)
+
+
+def _coordinates_of(x):
+    return getattr(x, 'coordinates', x)
+
+
+def _coordinates_of_pair(u, v):
+    u, v = _coordinates_of(u), _coordinates_of(v)
+    if len(u) != len(v):
+        raise ValueError('The vectors must have the same dimension')
+    return u, v
+
+
+def _floats(xs):
+    return [float(x) for x in xs]
+
+
+def _fractions(xs):
+    return [Fraction(x) for x in xs]
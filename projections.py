@@ -0,0 +1,111 @@
+import numpy as np
+
+from vector_batch import VectorBatch, as_coordinate_array, vector_from_floats
+from vectors_final import Vector
+
+NO_UNIQUE_PARALLEL_COMPONENT_MSG = Vector.NO_UNIQUE_PARALLEL_COMPONENT_MSG
+
+
+def project_onto(vectors, basis):
+    """Returns the components of many vectors parallel to one basis vector
+    as a VectorBatch. The basis is normalized once for the whole batch"""
+
+    return VectorBatch(as_coordinate_array(vectors)).find_v_parallel_to(basis)
+
+
+def reject_from(vectors, basis):
+    """Returns the components of many vectors orthogonal to one basis vector """
+
+    return VectorBatch(as_coordinate_array(vectors)).find_v_orthongonal_to(basis)
+
+
+def project_onto_subspace(vectors, basis_vectors, tolerance=1e-10):
+    """Returns the orthogonal projections of many vectors onto the subspace
+    spanned by basis_vectors, which need not be orthogonal or independent.
+
+    The basis is orthonormalized once with modified Gram-Schmidt, then all
+    vectors are projected with two matrix products."""
+
+    q = _orthonormal_columns(basis_vectors, tolerance)
+    if not q.shape[1]:
+        raise Exception(NO_UNIQUE_PARALLEL_COMPONENT_MSG)
+
+    data = as_coordinate_array(vectors)
+    return VectorBatch(data.dot(q).dot(q.T))
+
+
+def reject_from_subspace(vectors, basis_vectors, tolerance=1e-10):
+    """Returns the components of many vectors orthogonal to the subspace
+    spanned by basis_vectors"""
+
+    data = as_coordinate_array(vectors)
+    return VectorBatch(data - project_onto_subspace(data, basis_vectors,
+                                                    tolerance).coordinates)
+
+
+def qr(vectors, tolerance=1e-10):
+    """Modified Gram-Schmidt QR factorization of k vectors of dimension d.
+
+    Returns (Q, R) as arrays: the d x k matrix A whose columns are the
+    vectors equals Q.dot(R), Q has orthonormal columns and R is k x k upper
+    triangular. A vector that is linearly dependent on the earlier ones,
+    within tolerance relative to its own length, gets a zero column in Q
+    and a zero on the diagonal of R."""
+
+    a = as_coordinate_array(vectors).T.copy()
+    d, k = a.shape
+    q = np.zeros((d, k))
+    r = np.zeros((k, k))
+
+    lengths = np.sqrt(np.einsum('ij,ij->j', a, a))
+    for j in range(k):
+        column = a[:, j]
+        norm = np.sqrt(column.dot(column))
+        r[j, j] = norm
+        if norm <= tolerance * lengths[j]:
+            r[j, j] = 0.0
+            continue
+
+        q[:, j] = column / norm
+        # modified Gram-Schmidt: remove the new direction from every later
+        # column right away, rather than projecting the originals
+        r[j, j + 1:] = q[:, j].dot(a[:, j + 1:])
+        a[:, j + 1:] -= np.outer(q[:, j], r[j, j + 1:])
+
+    return q, r
+
+
+def gram_schmidt(vectors, tolerance=1e-10, backend=None):
+    """Returns an orthonormal list of Vectors spanning the same space as
+    vectors, dropping vectors that are linearly dependent on earlier ones.
+
+    The Vectors are in backend, by default that of the first input Vector,
+    with coordinates converted as in vector_from_floats"""
+
+    if not isinstance(vectors, (VectorBatch, np.ndarray)):
+        vectors = list(vectors)
+        if backend is None and vectors and isinstance(vectors[0], Vector):
+            backend = vectors[0].backend
+    q = _orthonormal_columns(vectors, tolerance)
+    return [vector_from_floats(column, backend) for column in q.T.tolist()]
+
+
+def _orthonormal_columns(vectors, tolerance):
+    q, r = qr(vectors, tolerance)
+    return q[:, np.diag(r) != 0]
+
+
+def main():
+    """ projections quiz answers, one basis for a batch """
+    vectors = [Vector([3.039, 1.879]), Vector([-9.88, -3.264])]
+
+    # should print rows: [1.083, 2.672] and [-2.529, -6.242]
+    print(project_onto(vectors, Vector([0.825, 2.036])))
+
+    # should print two orthonormal vectors; the third is their sum and is dropped
+    for v in gram_schmidt([Vector([1, 1, 0]), Vector([1, 0, 1]), Vector([2, 1, 1])]):
+        print(v)
+
+
+if __name__ == '__main__':
+    main()
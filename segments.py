@@ -0,0 +1,277 @@
+from math import hypot
+
+import numpy as np
+
+from line_batch import intersect_lines
+from line_intersections import Line
+from numeric_backends import backend_of, in_backend_context
+from vectors_final import Vector
+
+
+class Segment(Line):
+    """The part of a 2-d line between two endpoints.
+
+    The normal vector and constant term are those of the line through the
+    endpoints, so every Line method still applies to the whole line."""
+
+    def __init__(self, start, end, backend=None):
+        backend = backend_of(start, backend)
+        if start.backend is not backend:
+            start = Vector(start.coordinates, backend)
+        end = Vector(start._coordinates_of(end), backend)
+
+        self.start = start
+        self.end = end
+        normal_vector, constant_term = _line_through(start, end)
+        Line.__init__(self, normal_vector, constant_term, backend)
+
+    def __str__(self):
+        return 'Segment: {} to {}'.format(self.start.coordinates,
+                                          self.end.coordinates)
+
+    @in_backend_context
+    def intersects(self, segment2):
+        """Tests if two segments share at least one point """
+
+        p, q = self.start.coordinates, self.end.coordinates
+        r = self.start._coordinates_of(segment2.start)
+        s = self.start._coordinates_of(segment2.end)
+
+        if not _boxes_overlap(p, q, r, s):
+            return False
+        return (_orientation(p, q, r) * _orientation(p, q, s) <= 0 and
+                _orientation(r, s, p) * _orientation(r, s, q) <= 0)
+
+    @in_backend_context
+    def intersection_with(self, segment2):
+        """Returns the crossing point of two segments as a Vector, the shared
+        part as a Segment when they overlap along a line, or None when they
+        do not meet"""
+
+        if not self.intersects(segment2):
+            return None
+
+        point = Line.intersection_with(self, segment2)
+        if isinstance(point, Vector):
+            return point
+
+        # collinear: the overlap runs between the middle two endpoints
+        direction = self.end.minus(self.start)
+        if direction.is_zero():
+            return self.start
+        endpoints = sorted([self.start, self.end, segment2.start, segment2.end],
+                           key=direction.find_dot_product)
+        if endpoints[1] == endpoints[2]:
+            return endpoints[1]
+        return Segment(endpoints[1], endpoints[2], self.backend)
+
+
+def segments_to_arrays(segments):
+    """Returns the start and end points of a sequence of Segment objects as
+    two N x 2 float64 arrays"""
+
+    starts = np.array([s.start.coordinates for s in segments],
+                      dtype=np.float64).reshape(-1, 2)
+    ends = np.array([s.end.coordinates for s in segments],
+                    dtype=np.float64).reshape(-1, 2)
+    return starts, ends
+
+
+def find_intersecting_pairs(starts, ends, cell_size=None, tolerance=1e-10):
+    """Returns every pair (i, j), i < j, of intersecting segments as a K x 2
+    array, for N segments from starts[i] to ends[i].
+
+    The segments' bounding boxes are entered into a uniform grid of square
+    cells (by default as wide as the average box), and only segments
+    sharing a cell are tested, with vectorized orientation tests. Each
+    candidate pair is tested once, in the cell holding the lower left
+    corner of its two boxes' overlap. For segments of similar length this
+    takes O(N + K) work instead of O(N**2).
+
+    Three points count as collinear when the sine of the angle between
+    them is within tolerance of zero, so the result does not depend on the
+    scale of the coordinates."""
+
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    if len(starts) != len(ends):
+        raise ValueError('Every segment needs a start and an end point')
+
+    low = np.minimum(starts, ends)
+    high = np.maximum(starts, ends)
+    if cell_size is None:
+        cell_size = _default_cell_size(low, high)
+    origin = low.min(axis=0) if len(low) else np.zeros(2)
+
+    cell_low = np.floor((low - origin) / cell_size).astype(np.int64)
+    cell_high = np.floor((high - origin) / cell_size).astype(np.int64)
+    cells, members = _grid_entries(cell_low, cell_high)
+
+    first, second, pair_cells = _pairs_sharing_cells(cells, members)
+
+    # drop pairs whose boxes do not overlap, and pairs that share more than
+    # one cell everywhere but in the cell of their overlap's corner
+    overlap_low = np.maximum(low[first], low[second])
+    overlap_high = np.minimum(high[first], high[second])
+    keep = np.all(overlap_low <= overlap_high, axis=1)
+    home = np.maximum(cell_low[first], cell_low[second])
+    keep &= _cell_keys(home, cell_high) == pair_cells
+    first, second = first[keep], second[keep]
+
+    p, q = starts[first], ends[first]
+    r, s = starts[second], ends[second]
+    hits = ((_orientations(p, q, r, tolerance) * _orientations(p, q, s, tolerance) <= 0) &
+            (_orientations(r, s, p, tolerance) * _orientations(r, s, q, tolerance) <= 0))
+
+    pairs = np.column_stack((first[hits], second[hits]))
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def segment_intersection_points(starts, ends, pairs, tolerance=1e-10):
+    """Returns the crossing point of each segment pair as a K x 2 array,
+    NaN for pairs that overlap along a line"""
+
+    normals, constants = _lines_of(starts, ends)
+    first, second = pairs[:, 0], pairs[:, 1]
+    return intersect_lines(normals[first], constants[first],
+                           normals[second], constants[second], tolerance)[0]
+
+
+def _line_through(start, end):
+    p, q = start.coordinates, end.coordinates
+    normal_vector = Vector._from_backend_values([q[1] - p[1], p[0] - q[0]],
+                                                start.backend)
+    return normal_vector, normal_vector.find_dot_product(start)
+
+
+def _orientation(p, q, r, tolerance=1e-10):
+    """Sign of the turn from p to q to r: 1 for left, -1 for right and 0
+    when the points are collinear, i.e. when the sine of the angle at p is
+    within tolerance of zero"""
+
+    turn = (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+    scale = (hypot(float(q[0] - p[0]), float(q[1] - p[1])) *
+             hypot(float(r[0] - p[0]), float(r[1] - p[1])))
+    if abs(float(turn)) <= tolerance * scale:
+        return 0
+    return 1 if turn > 0 else -1
+
+
+def _boxes_overlap(p, q, r, s):
+    for axis in range(2):
+        if max(p[axis], q[axis]) < min(r[axis], s[axis]):
+            return False
+        if max(r[axis], s[axis]) < min(p[axis], q[axis]):
+            return False
+    return True
+
+
+def _lines_of(starts, ends):
+    """Returns the normal vectors and constant terms n.x = k of the lines
+    through each segment"""
+
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    normals = np.column_stack((ends[:, 1] - starts[:, 1],
+                               starts[:, 0] - ends[:, 0]))
+    return normals, np.einsum('ij,ij->i', normals, starts)
+
+
+def _orientations(p, q, r, tolerance):
+    """_orientation for arrays of points """
+
+    u = q - p
+    v = r - p
+    turns = u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]
+    scale = np.hypot(u[:, 0], u[:, 1]) * np.hypot(v[:, 0], v[:, 1])
+    turns[np.abs(turns) <= tolerance * scale] = 0
+    return np.sign(turns)
+
+
+def _default_cell_size(low, high):
+    """About the size of an average segment, so each segment covers a few
+    cells and each cell holds a few segments"""
+
+    if not len(low):
+        return 1.0
+    size = np.mean(np.max(high - low, axis=1))
+    if size > 0:
+        return size
+    spread = np.max(high.max(axis=0) - low.min(axis=0))
+    return spread / np.sqrt(len(low)) if spread > 0 else 1.0
+
+
+def _grid_entries(cell_low, cell_high):
+    """Returns one (cell key, segment index) entry for every grid cell that
+    a segment's bounding box covers"""
+
+    spans = cell_high - cell_low + 1
+    counts = spans[:, 0] * spans[:, 1]
+    members = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    columns = spans[members, 0]
+    cells = np.column_stack((cell_low[members, 0] + offsets % columns,
+                             cell_low[members, 1] + offsets // columns))
+    return _cell_keys(cells, cell_high), members
+
+
+def _cell_keys(cells, cell_high):
+    rows = cell_high[:, 1].max() + 1 if len(cell_high) else 1
+    return cells[:, 0] * rows + cells[:, 1]
+
+
+def _pairs_sharing_cells(cells, members):
+    """Returns (first, second, cell) for every two segments entered in the
+    same cell, with first < second.
+
+    After sorting the entries by cell, entries that are shift places apart
+    share a cell only if the cell holds more than shift segments, so the
+    loop ends after the size of the fullest cell."""
+
+    order = np.argsort(cells, kind='mergesort')
+    cells, members = cells[order], members[order]
+
+    firsts, seconds, pair_cells = [], [], []
+    shift = 1
+    while shift < len(cells):
+        same = np.flatnonzero(cells[shift:] == cells[:-shift])
+        if not len(same):
+            break
+        firsts.append(members[same])
+        seconds.append(members[same + shift])
+        pair_cells.append(cells[same])
+        shift += 1
+
+    if not firsts:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, np.empty(0, dtype=np.int64)
+    first, second = np.concatenate(firsts), np.concatenate(seconds)
+    return (np.minimum(first, second), np.maximum(first, second),
+            np.concatenate(pair_cells))
+
+
+def main():
+    """ crossing, touching, overlapping and separate segments """
+    segments = [Segment(Vector([0, 0]), Vector([4, 4])),
+                Segment(Vector([0, 4]), Vector([4, 0])),
+                Segment(Vector([4, 4]), Vector([6, 2])),
+                Segment(Vector([2, 2]), Vector([6, 6])),
+                Segment(Vector([5, 0]), Vector([6, 0]))]
+
+    # should print Vector: (Decimal('2.00000'), Decimal('2.00000'))
+    print(segments[0].intersection_with(segments[1]))
+
+    # should print Segment: (Decimal('2'), Decimal('2')) to (Decimal('4'), Decimal('4'))
+    print(segments[0].intersection_with(segments[3]))
+
+    # should print None
+    print(segments[0].intersection_with(segments[4]))
+
+    # should print [[0 1] [0 2] [0 3] [1 3] [2 3]]
+    starts, ends = segments_to_arrays(segments)
+    print(find_intersecting_pairs(starts, ends).tolist())
+
+
+if __name__ == '__main__':
+    main()
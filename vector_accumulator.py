@@ -0,0 +1,166 @@
+from itertools import islice
+from operator import add, sub, mul
+
+from numeric_backends import backend_of, get_backend, in_backend_context
+from vectors_final import Vector
+
+
+class VectorAccumulator(object):
+    """A mutable buffer of coordinates for summing and blending many
+    vectors without building a Vector per step.
+
+    add, subtract, scale and axpy update the buffer in place. Vectors of
+    the accumulator's backend are read as they are, so their coordinates
+    are not converted again; only scalars are converted, once per call.
+    freeze() returns the current value as an ordinary Vector."""
+
+    CHUNK_SIZE = 1024
+
+    def __init__(self, start, backend=None):
+        """start is a Vector to copy, or a dimension to start from zero """
+
+        if isinstance(start, Vector):
+            self.backend = backend_of(start, backend)
+            self.dimension = start.dimension
+            self.values = list(self._coordinates_of(start))
+        else:
+            self.backend = get_backend(backend)
+            if start < 1:
+                raise ValueError('The dimension must be positive')
+            self.dimension = start
+            self.values = [self.backend.convert(0)] * start
+
+    def _coordinates_of(self, v):
+        if v.dimension != self.dimension:
+            raise ValueError('The vectors must have the same dimension')
+        if v.backend is self.backend:
+            return v.coordinates
+        convert = self.backend.convert
+        return [convert(x) for x in v.coordinates]
+
+    def __len__(self):
+        return self.dimension
+
+    def __str__(self):
+        return 'VectorAccumulator: {}'.format(tuple(self.values))
+
+    @in_backend_context
+    def add(self, v):
+        """Adds a vector to the buffer. Returns self """
+
+        self.values[:] = map(add, self.values, self._coordinates_of(v))
+        return self
+
+    @in_backend_context
+    def subtract(self, v):
+        """Subtracts a vector from the buffer. Returns self """
+
+        self.values[:] = map(sub, self.values, self._coordinates_of(v))
+        return self
+
+    @in_backend_context
+    def scale(self, c):
+        """Multiplies the buffer by a scalar. Returns self """
+
+        c = self.backend.convert(c)
+        self.values[:] = [x * c for x in self.values]
+        return self
+
+    @in_backend_context
+    def axpy(self, a, x):
+        """Adds a times the vector x to the buffer in one pass, the fused
+        form of plus(x.times_scalar(a)). Returns self"""
+
+        a = self.backend.convert(a)
+        self.values[:] = [y + a * xi for y, xi in zip(self.values, self._coordinates_of(x))]
+        return self
+
+    @in_backend_context
+    def add_all(self, vectors):
+        """Adds every vector of an iterable to the buffer. Returns self.
+
+        Vectors are taken CHUNK_SIZE at a time and each coordinate column
+        is added up with the builtin sum, in the same order as repeated
+        add() calls, so the result is identical but the per-vector loop
+        runs in C."""
+
+        vectors = iter(vectors)
+        values = self.values
+        while True:
+            chunk = [self._coordinates_of(v) for v in islice(vectors, self.CHUNK_SIZE)]
+            if not chunk:
+                return self
+            values[:] = [sum(column, start)
+                         for start, column in zip(values, zip(*chunk))]
+
+    @in_backend_context
+    def multiply(self, v):
+        """Multiplies the buffer coordinate-wise by a vector. Returns self """
+
+        self.values[:] = map(mul, self.values, self._coordinates_of(v))
+        return self
+
+    def reset(self):
+        """Sets the buffer back to zero. Returns self """
+
+        self.values[:] = [self.backend.convert(0)] * self.dimension
+        return self
+
+    def freeze(self):
+        """Returns the buffer as a Vector. The accumulator can keep being
+        updated without affecting the returned Vector"""
+
+        return Vector._from_backend_values(self.values, self.backend)
+
+
+def sum_vectors(vectors, backend=None):
+    """Returns the sum of a nonempty iterable of Vectors """
+
+    total, count = _accumulate(vectors, backend)
+    return total.freeze()
+
+
+def centroid(vectors, backend=None):
+    """Returns the mean of a nonempty iterable of Vectors """
+
+    total, count = _accumulate(vectors, backend)
+    return total.scale(total.backend.convert(1) / count).freeze()
+
+
+def _accumulate(vectors, backend):
+    vectors = iter(vectors)
+    try:
+        total = VectorAccumulator(next(vectors), backend)
+    except StopIteration:
+        raise ValueError('Expected at least one vector')
+
+    count = [1]
+
+    def counted():
+        for v in vectors:
+            count[0] += 1
+            yield v
+
+    total.add_all(counted())
+    return total, count[0]
+
+
+def main():
+    """ sums and blends without intermediate vectors """
+    points = [Vector([1, 2, 3]), Vector([4, 5, 6]), Vector([7, 8, 9])]
+
+    # should print Vector: (Decimal('12'), Decimal('15'), Decimal('18'))
+    print(sum_vectors(points))
+
+    # should print Vector: (Decimal('4.000000'), Decimal('5.000000'), Decimal('6.000000'))
+    print(centroid(points))
+
+    # should print Vector: (Decimal('3.25'), Decimal('4.25'), Decimal('5.25'))
+    force = VectorAccumulator(3)
+    for weight, point in zip([0.5, 0.25, 0.25], points):
+        force.axpy(weight, point)
+    print(force.freeze())
+
+
+if __name__ == '__main__':
+    main()
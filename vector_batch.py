@@ -0,0 +1,304 @@
+from numbers import Integral
+
+import numpy as np
+
+from numeric_backends import FLOAT, get_backend
+from vectors_final import Vector
+
+
+class VectorBatch(object):
+    """Stores N vectors of the same dimension as one N x d float64 array and
+    runs the Vector methods over every row at once. N may be 0, e.g. for
+    the face normals of an empty mesh"""
+
+    CANNOT_NORMALIZE_ZERO_VECTOR_MSG = "Cannot normalize the zero vector"
+    NO_UNIQUE_PARALLEL_COMPONENT_MSG = "No unique parallel component"
+    NO_UNIQUE_ORTHOGONAL_COMPONENT_MSG = "No unique orthogonal component"
+
+    def __init__(self, coordinates):
+        try:
+            array = np.ascontiguousarray(coordinates, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise TypeError('The coordinates must be an N x d array of numbers')
+
+        if array.ndim == 1:
+            array = array.reshape(1, -1)
+        if array.ndim != 2 or array.shape[1] == 0:
+            raise ValueError('The coordinates must be an N x d array with d > 0')
+
+        self.coordinates = array
+        self.dimension = array.shape[1]
+
+    @classmethod
+    def from_vectors(cls, vectors):
+        """Builds a batch from an iterable of Vector objects """
+
+        rows = [v.coordinates for v in vectors]
+        if not rows:
+            raise ValueError('The coordinates must be nonempty')
+        return cls(np.array(rows, dtype=np.float64))
+
+    def to_vectors(self, backend=None):
+        """Returns the batch rows as a list of Vector objects, see
+        vector_from_floats"""
+
+        return [vector_from_floats(row, backend) for row in self.coordinates.tolist()]
+
+    def __len__(self):
+        return self.coordinates.shape[0]
+
+    def __getitem__(self, index):
+        """Returns one row as a Vector, or a slice of rows as a VectorBatch """
+
+        if isinstance(index, Integral):
+            return vector_from_floats(self.coordinates[index].tolist())
+        return VectorBatch(self.coordinates[index])
+
+    def __iter__(self):
+        for row in self.coordinates.tolist():
+            yield vector_from_floats(row)
+
+    def __str__(self):
+        """prints batch shape and coordinates as string """
+
+        return 'VectorBatch {}x{}: {}'.format(len(self), self.dimension,
+                                              self.coordinates)
+
+    def __eq__(self, v):
+        """Tests if a batch is equal to another """
+
+        return np.array_equal(self.coordinates, _as_array(v))
+
+    def __ne__(self, v):
+        return not self == v
+
+    def plus(self, v):
+        """Adds each row with the matching row of v, or with a single Vector """
+
+        return VectorBatch(self.coordinates + _as_array(v))
+
+    def minus(self, v):
+        """Subtracts the matching row of v, or a single Vector, from each row """
+
+        return VectorBatch(self.coordinates - _as_array(v))
+
+    def multiply(self, v):
+        """Multiplies each row coordinate-wise with v """
+
+        return VectorBatch(self.coordinates * _as_array(v))
+
+    def times_scalar(self, c):
+        """Multiplies every row by a scalar, or row i by c[i] """
+
+        return VectorBatch(self.coordinates * _as_scalars(c))
+
+    def find_magnitude(self):
+        """Returns the magnitude of every row as an array of length N """
+
+        return np.sqrt(np.einsum('ij,ij->i', self.coordinates, self.coordinates))
+
+    def find_normalization_vector(self):
+        """Returns a batch of unit vectors, one per row """
+
+        magnitudes = self.find_magnitude()
+        if not magnitudes.all():
+            raise Exception(self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG)
+        return VectorBatch(self.coordinates / magnitudes[:, np.newaxis])
+
+    def find_dot_product(self, v):
+        """Returns the dot product of every row with v as an array """
+
+        other = _as_array(v)
+        if other.ndim == 1:
+            return self.coordinates.dot(other)
+        return np.einsum('ij,ij->i', self.coordinates, other)
+
+    def find_vectors_angle(self, v, in_degrees=False):
+        """Returns the angle between every row and v in radians or degrees"""
+
+        other = _as_array(v)
+        mag1 = self.find_magnitude()
+        if other.ndim == 1:
+            mag2 = np.sqrt(other.dot(other))
+        else:
+            mag2 = np.sqrt(np.einsum('ij,ij->i', other, other))
+
+        denominator = mag1 * mag2
+        if not np.all(denominator):
+            raise Exception("Cannot calculate angle with zero vector")
+
+        ratio = np.clip(self.find_dot_product(other) / denominator, -1.0, 1.0)
+        angles = np.arccos(ratio)
+
+        if in_degrees:
+            return np.degrees(angles)
+        return angles
+
+    def is_orthogonal_to(self, v, tolerance=1e-10):
+        """Returns a boolean array, True where a row is orthogonal to v"""
+
+        return np.abs(self.find_dot_product(v)) < tolerance
+
+    def is_parallel_to(self, v, tolerance=1e-10):
+        """Returns a boolean array, True where a row is parallel to v or
+        either is a zero vector.
+
+        Rows count as parallel when 1 - |cos| <= tolerance, as in
+        pairwise.parallel_mask. Testing the cosine rather than the angle
+        keeps float rounding of exactly parallel vectors, which arccos
+        would blow up to about 1e-8, well inside the tolerance."""
+
+        other = _as_array(v)
+        parallel = self.is_zero(tolerance)
+        if other.ndim == 1:
+            parallel |= np.sqrt(other.dot(other)) < tolerance
+        else:
+            parallel |= VectorBatch(other).is_zero(tolerance)
+
+        nonzero = ~parallel
+        if nonzero.any():
+            rows = self.coordinates[nonzero]
+            others = other if other.ndim == 1 else other[nonzero]
+            magnitudes = np.sqrt(np.einsum('ij,ij->i', rows, rows))
+            if others.ndim == 1:
+                other_magnitudes = np.sqrt(others.dot(others))
+                dots = rows.dot(others)
+            else:
+                other_magnitudes = np.sqrt(np.einsum('ij,ij->i', others, others))
+                dots = np.einsum('ij,ij->i', rows, others)
+            cosines = dots / (magnitudes * other_magnitudes)
+            parallel[nonzero] = 1.0 - np.abs(cosines) <= tolerance
+        return parallel
+
+    def is_zero(self, tolerance=1e-10):
+        """Returns a boolean array, True where a row is the zero vector """
+
+        return self.find_magnitude() < tolerance
+
+    def find_v_parallel_to(self, basis):
+        """Returns the projection of every row onto basis, a single Vector
+        or a batch of one basis per row"""
+
+        try:
+            norm_b = _as_batch(basis).find_normalization_vector()
+        except Exception as e:
+            if str(e) == self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG:
+                raise Exception(self.NO_UNIQUE_PARALLEL_COMPONENT_MSG)
+            else:
+                raise e
+
+        unit = norm_b.coordinates
+        if len(norm_b) == 1:
+            unit = unit[0]
+        weights = self.find_dot_product(unit)
+        return VectorBatch(weights[:, np.newaxis] * unit)
+
+    def find_v_orthongonal_to(self, basis):
+        """Returns the component of every row orthogonal to basis"""
+
+        try:
+            projection = self.find_v_parallel_to(basis)
+        except Exception as e:
+            if str(e) == self.NO_UNIQUE_PARALLEL_COMPONENT_MSG:
+                raise Exception(self.NO_UNIQUE_ORTHOGONAL_COMPONENT_MSG)
+            else:
+                raise e
+        return self.minus(projection)
+
+    def find_cross_product_of(self, v):
+        """Calculates cross products of 2-d or 3-d rows with v.
+
+        As with Vector, 2-d rows produce 3-d vectors along the z axis."""
+
+        other = _as_array(v)
+        if self.dimension == 2 and other.shape[-1] == 2:
+            z = (self.coordinates[:, 0] * other[..., 1] -
+                 self.coordinates[:, 1] * other[..., 0])
+            result = np.zeros((len(self), 3))
+            result[:, 2] = z
+            return VectorBatch(result)
+
+        if self.dimension == 3 and other.shape[-1] == 3:
+            return VectorBatch(np.cross(self.coordinates, other))
+
+        raise ValueError('Cross products need 2-d or 3-d vectors of '
+                         'matching dimension')
+
+    def find_parallogram_area_of(self, v):
+        """Calculates parallelogram areas spanned by every row and v """
+
+        return self.find_cross_product_of(v).find_magnitude()
+
+    def find_triangle_area_of(self, v):
+        """Calculates triangle areas spanned by every row and v """
+
+        return self.find_parallogram_area_of(v) / 2.0
+
+
+def vector_from_floats(values, backend=None):
+    """Builds a Vector from float coordinates. For a Decimal or Fraction
+    backend every float is converted from its shortest repr, so 0.1
+    becomes Decimal('0.1') rather than its binary expansion"""
+
+    backend = get_backend(backend)
+    if backend is FLOAT:
+        return Vector._from_backend_values([float(x) for x in values], FLOAT)
+    return Vector([repr(float(x)) for x in values], backend)
+
+
+def as_coordinate_array(vectors):
+    """Returns a VectorBatch, N x d array or sequence of Vectors (or of
+    coordinate sequences) as an N x d float64 array, without copying a
+    batch or float64 array"""
+
+    if isinstance(vectors, VectorBatch):
+        return vectors.coordinates
+    if isinstance(vectors, np.ndarray):
+        matrix = np.asarray(vectors, dtype=np.float64)
+    else:
+        matrix = np.array([v.coordinates if isinstance(v, Vector) else v
+                           for v in vectors], dtype=np.float64)
+    if matrix.ndim != 2 or not len(matrix):
+        raise ValueError('Expected a nonempty set of vectors of equal dimension')
+    return matrix
+
+
+def _as_array(v):
+    """Returns the float64 coordinates of a VectorBatch, Vector or array"""
+
+    if isinstance(v, VectorBatch):
+        return v.coordinates
+    if isinstance(v, Vector):
+        return np.array(v.coordinates, dtype=np.float64)
+    return np.asarray(v, dtype=np.float64)
+
+
+def _as_batch(v):
+    if isinstance(v, VectorBatch):
+        return v
+    return VectorBatch(_as_array(v))
+
+
+def _as_scalars(c):
+    """Returns c as a float, or as a column so that row i is scaled by c[i]"""
+
+    scalars = np.asarray(c, dtype=np.float64)
+    if scalars.ndim == 1:
+        return scalars[:, np.newaxis]
+    return scalars
+
+
+def main():
+    """ batch versions of the cross product quiz """
+    v = VectorBatch([[8.462, 7.893, -8.187], [-8.987, -9.838, 5.031]])
+    w = VectorBatch([[6.984, -5.975, 4.778], [-4.268, -1.861, -8.866]])
+
+    # should print rows: [-11.205, -97.609, -105.685] and [96.586, -101.151, -25.264]
+    print(v.find_cross_product_of(w))
+
+    # should print areas: [144.300, 142.122]
+    print(v.find_parallogram_area_of(w))
+
+
+if __name__ == '__main__':
+    main()
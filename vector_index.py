@@ -0,0 +1,190 @@
+import numpy as np
+
+from vector_batch import as_coordinate_array
+from vectors_final import Vector
+
+
+class KDTreeIndex(object):
+    """KD-tree over a fixed set of vectors for Euclidean k-nearest
+    neighbour queries.
+
+    Nodes split the widest coordinate at its median until at most
+    leaf_size points remain. The points are stored reordered so every leaf
+    is a contiguous block of rows, and leaves are scanned with numpy.
+    Indices returned by queries refer to the order the vectors were given
+    in."""
+
+    def __init__(self, vectors, leaf_size=32):
+        data = as_coordinate_array(vectors)
+        self.dimension = data.shape[1]
+        self.leaf_size = max(1, int(leaf_size))
+
+        order = np.arange(len(data))
+        self._start = []
+        self._end = []
+        self._split_dim = []
+        self._split_value = []
+        self._left = []
+        self._right = []
+
+        root = self._new_node(0, len(data))
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            start, end = self._start[node], self._end[node]
+            if end - start <= self.leaf_size:
+                continue
+
+            points = data[order[start:end]]
+            spread = points.max(axis=0) - points.min(axis=0)
+            dim = int(np.argmax(spread))
+            if spread[dim] == 0:
+                continue
+
+            mid = (start + end) // 2
+            part = np.argpartition(points[:, dim], mid - start)
+            order[start:end] = order[start:end][part]
+
+            self._split_dim[node] = dim
+            self._split_value[node] = float(data[order[mid], dim])
+            self._left[node] = self._new_node(start, mid)
+            self._right[node] = self._new_node(mid, end)
+            stack.append(self._left[node])
+            stack.append(self._right[node])
+
+        self._order = order
+        self.data = data[order]
+
+    def _new_node(self, start, end):
+        self._start.append(start)
+        self._end.append(end)
+        self._split_dim.append(-1)
+        self._split_value.append(0.0)
+        self._left.append(-1)
+        self._right.append(-1)
+        return len(self._start) - 1
+
+    def __len__(self):
+        return len(self.data)
+
+    def query(self, vector, k=1):
+        """Returns (distances, indices) of the k vectors closest to vector,
+        nearest first"""
+
+        q = _as_query(vector, self.dimension)
+        k = min(k, len(self.data))
+        q_list = q.tolist()
+
+        best_d = np.full(k, np.inf)
+        best_i = np.full(k, -1, dtype=np.intp)
+        worst = np.inf
+
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if bound >= worst:
+                continue
+
+            left = self._left[node]
+            if left == -1:
+                start, end = self._start[node], self._end[node]
+                diff = self.data[start:end] - q
+                d2 = np.einsum('ij,ij->i', diff, diff)
+                if d2.min() < worst:
+                    candidates_d = np.concatenate((best_d, d2))
+                    candidates_i = np.concatenate((best_i, np.arange(start, end)))
+                    keep = np.argpartition(candidates_d, k - 1)[:k]
+                    best_d, best_i = candidates_d[keep], candidates_i[keep]
+                    worst = best_d.max()
+                continue
+
+            offset = q_list[self._split_dim[node]] - self._split_value[node]
+            if offset < 0:
+                near, far = left, self._right[node]
+            else:
+                near, far = self._right[node], left
+            stack.append((far, max(bound, offset * offset)))
+            stack.append((near, bound))
+
+        nearest = np.argsort(best_d, kind='mergesort')
+        return np.sqrt(best_d[nearest]), self._order[best_i[nearest]]
+
+    def query_batch(self, vectors, k=1):
+        """Returns (distances, indices), each Q x k, for Q query vectors """
+
+        queries = as_coordinate_array(vectors)
+        k = min(k, len(self.data))
+        distances = np.empty((len(queries), k))
+        indices = np.empty((len(queries), k), dtype=np.intp)
+        for row, q in enumerate(queries):
+            distances[row], indices[row] = self.query(q, k)
+        return distances, indices
+
+
+class CosineIndex(object):
+    """Cosine similarity top-k search over a fixed set of vectors.
+
+    The vectors are normalized once into a matrix of unit rows, so a query
+    is one matrix product followed by a partial sort. Zero vectors get
+    similarity 0 with everything. float32 halves memory and roughly
+    doubles speed at about 7 significant digits."""
+
+    def __init__(self, vectors, dtype=np.float64):
+        data = as_coordinate_array(vectors)
+        self.dimension = data.shape[1]
+        self.unit = _normalize_rows(data).astype(dtype, copy=False)
+
+    def __len__(self):
+        return len(self.unit)
+
+    def query(self, vector, k=1):
+        """Returns (similarities, indices) of the k vectors most aligned with
+        vector, best first"""
+
+        q = _normalize_rows(_as_query(vector, self.dimension)[np.newaxis, :])[0]
+        similarities = self.unit.dot(q.astype(self.unit.dtype))
+        top_similarities, top_indices = _top_k(similarities[np.newaxis, :], k)
+        return top_similarities[0], top_indices[0]
+
+    def query_batch(self, vectors, k=1, block_size=1024):
+        """Returns (similarities, indices), each Q x k, for Q query vectors.
+        Queries are processed block_size at a time to bound memory"""
+
+        queries = _normalize_rows(as_coordinate_array(vectors)).astype(self.unit.dtype)
+        k = min(k, len(self.unit))
+        similarities = np.empty((len(queries), k))
+        indices = np.empty((len(queries), k), dtype=np.intp)
+        for start in range(0, len(queries), block_size):
+            block = queries[start:start + block_size].dot(self.unit.T)
+            similarities[start:start + block_size], indices[start:start + block_size] = _top_k(block, k)
+        return similarities, indices
+
+
+def _top_k(scores, k):
+    """Returns the k largest scores of every row and their column indices,
+    largest first"""
+
+    k = min(k, scores.shape[1])
+    rows = np.arange(scores.shape[0])[:, np.newaxis]
+    if k < scores.shape[1]:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    order = np.argsort(-scores[rows, top], axis=1, kind='mergesort')
+    top = top[rows, order]
+    return scores[rows, top], top
+
+
+def _normalize_rows(data):
+    magnitudes = np.sqrt(np.einsum('ij,ij->i', data, data))
+    magnitudes[magnitudes == 0] = 1.0
+    return data / magnitudes[:, np.newaxis]
+
+
+def _as_query(vector, dimension):
+    if isinstance(vector, Vector):
+        vector = vector.coordinates
+    q = np.asarray(vector, dtype=np.float64).reshape(-1)
+    if q.shape[0] != dimension:
+        raise ValueError('The query must have dimension {}'.format(dimension))
+    return q
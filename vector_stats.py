@@ -0,0 +1,231 @@
+import numpy as np
+
+from vector_batch import VectorBatch, as_coordinate_array
+from vector_stream import DEFAULT_CHUNK_SIZE, rechunk
+from vectors_final import Vector
+
+
+class VectorStatistics(object):
+    """Single pass count, sum, mean, per-axis min and max, covariance and
+    mean direction of a stream of vectors, in O(d**2) memory.
+
+    Each chunk's mean and centered co-moment matrix are computed with
+    numpy and folded into the running totals with the pairwise update of
+    Chan, Golub and LeVeque, the chunked form of Welford's algorithm, so
+    the covariance stays accurate when the mean is large compared to the
+    spread. The same update merges statistics computed by separate workers
+    on separate shards:
+
+        total = merge_all(pool.map(statistics_of_shard, shards))"""
+
+    EMPTY_MSG = 'No vectors have been added'
+
+    def __init__(self, dimension=None):
+        self.dimension = dimension
+        self.count = 0
+        self._sum = None
+        self._mean = None
+        self._comoment = None
+        self._min = None
+        self._max = None
+        self._direction_sum = None
+        self._nonzero_count = 0
+
+    def add(self, vectors):
+        """Adds a Vector, a VectorBatch or an N x d array of vectors.
+        Returns self"""
+
+        if isinstance(vectors, Vector):
+            vectors = [vectors.coordinates]
+        chunk = as_coordinate_array(vectors)
+        if not len(chunk):
+            return self
+        self._check_dimension(chunk.shape[1])
+
+        count = len(chunk)
+        mean = chunk.mean(axis=0)
+        centered = chunk - mean
+        magnitudes = np.sqrt(np.einsum('ij,ij->i', chunk, chunk))
+        nonzero = magnitudes > 0
+        directions = (chunk[nonzero] / magnitudes[nonzero, np.newaxis]).sum(axis=0)
+
+        self._fold(count, chunk.sum(axis=0), mean, centered.T.dot(centered),
+                   chunk.min(axis=0), chunk.max(axis=0),
+                   directions, int(nonzero.sum()))
+        return self
+
+    def consume(self, stream, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Adds every item of an iterable of Vectors, VectorBatches or
+        arrays, e.g. the chunks of vector_stream.read_csv_chunks. Runs of
+        single Vectors are gathered into chunks of chunk_size. Returns
+        self"""
+
+        pending = []
+        for item in stream:
+            if isinstance(item, Vector):
+                pending.append(item)
+                if len(pending) >= chunk_size:
+                    self._add_vectors(pending, chunk_size)
+                    pending = []
+                continue
+            self._add_vectors(pending, chunk_size)
+            pending = []
+            self.add(item)
+        self._add_vectors(pending, chunk_size)
+        return self
+
+    def merge(self, other):
+        """Adds the vectors summarized by another VectorStatistics, as if
+        they had been added to this one. Returns self"""
+
+        if other.count:
+            self._check_dimension(other.dimension)
+            self._fold(other.count, other._sum, other._mean, other._comoment,
+                       other._min, other._max, other._direction_sum,
+                       other._nonzero_count)
+        return self
+
+    def sum(self):
+        return self._require(self._sum).copy()
+
+    def mean(self):
+        return self._require(self._mean).copy()
+
+    def minimum(self):
+        """Returns the smallest value of every coordinate """
+
+        return self._require(self._min).copy()
+
+    def maximum(self):
+        """Returns the largest value of every coordinate """
+
+        return self._require(self._max).copy()
+
+    def covariance(self, ddof=1):
+        """Returns the d x d covariance matrix; ddof=1 for the sample
+        covariance, ddof=0 for the population covariance"""
+
+        comoment = self._require(self._comoment)
+        if self.count <= ddof:
+            return np.full_like(comoment, np.nan)
+        return comoment / (self.count - ddof)
+
+    def variance(self, ddof=1):
+        """Returns the variance of every coordinate """
+
+        return np.diag(self.covariance(ddof)).copy()
+
+    def mean_direction(self):
+        """Returns the unit vector along the sum of the unit vectors of all
+        nonzero vectors, or zeros when they cancel out"""
+
+        resultant = self._require(self._direction_sum)
+        length = np.sqrt(resultant.dot(resultant))
+        if length == 0:
+            return np.zeros_like(resultant)
+        return resultant / length
+
+    def mean_resultant_length(self):
+        """Returns the length of the mean of the unit vectors: 1 when all
+        vectors point the same way, near 0 when their directions are spread
+        out"""
+
+        resultant = self._require(self._direction_sum)
+        if not self._nonzero_count:
+            return 0.0
+        return float(np.sqrt(resultant.dot(resultant))) / self._nonzero_count
+
+    def mean_vector(self, backend=None):
+        """Returns the mean as a Vector """
+
+        return Vector(self.mean().tolist(), backend)
+
+    def as_dict(self):
+        """Returns all statistics as plain lists and numbers, e.g. for JSON """
+
+        return {
+            'count': self.count,
+            'dimension': self.dimension,
+            'sum': self.sum().tolist(),
+            'mean': self.mean().tolist(),
+            'min': self.minimum().tolist(),
+            'max': self.maximum().tolist(),
+            'covariance': self.covariance().tolist(),
+            'mean_direction': self.mean_direction().tolist(),
+            'mean_resultant_length': self.mean_resultant_length(),
+        }
+
+    def _add_vectors(self, vectors, chunk_size):
+        for batch in rechunk(vectors, chunk_size):
+            self.add(batch)
+
+    def _fold(self, count, total, mean, comoment, minimum, maximum,
+              direction_sum, nonzero_count):
+        if not self.count:
+            self.count = count
+            self._sum = np.array(total, dtype=np.float64)
+            self._mean = np.array(mean, dtype=np.float64)
+            self._comoment = np.array(comoment, dtype=np.float64)
+            self._min = np.array(minimum, dtype=np.float64)
+            self._max = np.array(maximum, dtype=np.float64)
+            self._direction_sum = np.array(direction_sum, dtype=np.float64)
+            self._nonzero_count = nonzero_count
+            return
+
+        combined = self.count + count
+        delta = mean - self._mean
+        self._mean += delta * (float(count) / combined)
+        self._comoment += comoment
+        self._comoment += np.outer(delta, delta) * (float(self.count) * count / combined)
+        self._sum += total
+        np.minimum(self._min, minimum, out=self._min)
+        np.maximum(self._max, maximum, out=self._max)
+        self._direction_sum += direction_sum
+        self._nonzero_count += nonzero_count
+        self.count = combined
+
+    def _check_dimension(self, dimension):
+        if self.dimension is None:
+            self.dimension = dimension
+        elif dimension != self.dimension:
+            raise ValueError('The vectors must have dimension {}'.format(self.dimension))
+
+    def _require(self, value):
+        if value is None:
+            raise Exception(self.EMPTY_MSG)
+        return value
+
+
+def statistics_of(stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Returns the VectorStatistics of an iterable of Vectors, VectorBatches
+    or arrays, read in one pass"""
+
+    return VectorStatistics().consume(stream, chunk_size)
+
+
+def merge_all(partials):
+    """Merges VectorStatistics computed separately, e.g. one per shard or
+    worker, into a new one"""
+
+    total = VectorStatistics()
+    for partial in partials:
+        total.merge(partial)
+    return total
+
+
+def main():
+    """ statistics of a stream and of two shards merged """
+    vectors = [Vector([1, 2]), Vector([3, 4]), Vector([5, 0]), Vector([-1, 2])]
+
+    stats = statistics_of(iter(vectors))
+    # should print mean [2. 2.], min [-1. 0.], max [5. 4.]
+    print('mean {}, min {}, max {}'.format(stats.mean(), stats.minimum(), stats.maximum()))
+
+    # should print the same covariance twice: [[6.667 -1.333] [-1.333 2.667]]
+    print(stats.covariance())
+    shards = [statistics_of(vectors[:1]), statistics_of(VectorBatch.from_vectors(vectors[1:]))]
+    print(merge_all(shards).covariance())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+import json
+from numbers import Integral
+
+import numpy as np
+
+from numeric_backends import FLOAT, get_backend, decimal_backend
+from vector_batch import VectorBatch
+from vectors_final import Vector, _clear_cache, _set
+
+FORMAT_VERSION = 1
+
+
+class VectorView(Vector):
+    """A Vector whose coordinates live in a row of a memory-mapped store.
+
+    Creating a view copies nothing. The coordinates are read from the
+    mapped file as a tuple of floats the first time a Vector method asks
+    for them, and kept like the Vector's other cached values, so later
+    writes to the row are not seen by that view. as_array() always reads
+    the row itself. Results of methods are ordinary Vectors."""
+
+    __slots__ = ('_row', '_coordinates')
+
+    def __init__(self, row):
+        _set(self, '_row', row)
+        _set(self, '_coordinates', None)
+        _set(self, 'dimension', row.shape[0])
+        _set(self, 'backend', FLOAT)
+        _clear_cache(self)
+
+    @property
+    def coordinates(self):
+        coordinates = self._coordinates
+        if coordinates is None:
+            coordinates = tuple(self._row.tolist())
+            _set(self, '_coordinates', coordinates)
+        return coordinates
+
+    def as_array(self):
+        """Returns the underlying float64 row, without copying """
+
+        return self._row
+
+    def to_vector(self, backend=None):
+        """Copies the view into a standalone Vector """
+
+        return Vector(self._row.tolist(), backend)
+
+    def __str__(self):
+        return 'VectorView: {}'.format(self.coordinates)
+
+
+class VectorStore(object):
+    """N vectors of dimension d saved as an N x d float64 .npy file that is
+    memory mapped on open, plus a small JSON file with metadata.
+
+    Opening a store only reads the headers, so it takes milliseconds
+    whatever the size, and processes opening the same file share the
+    operating system's page cache."""
+
+    def __init__(self, path, mode='r'):
+        self.path = _npy_path(path)
+        self.array = np.load(self.path, mmap_mode=mode)
+        if self.array.ndim != 2 or self.array.dtype != np.float64:
+            raise ValueError('{} does not hold an N x d float64 array'.format(self.path))
+
+        self.metadata = _read_metadata(self.path)
+        self.dimension = self.array.shape[1]
+
+    @classmethod
+    def open(cls, path, mode='r'):
+        """Opens a store read only ('r'), or for in-place updates ('r+')"""
+
+        return cls(path, mode)
+
+    @classmethod
+    def create(cls, path, count, dimension, precision=None, backend=None):
+        """Creates an empty store of count vectors to be filled in place,
+        e.g. chunk by chunk from vector_stream"""
+
+        path = _npy_path(path)
+        array = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64,
+                                          shape=(count, dimension))
+        del array
+        _write_metadata(path, count, dimension, precision, backend)
+        return cls(path, mode='r+')
+
+    def backend(self):
+        """Returns the numeric backend recorded for the stored vectors """
+
+        name = str(self.metadata.get('backend') or 'float')
+        if name == 'decimal':
+            return decimal_backend(self.metadata.get('precision'))
+        return get_backend(name)
+
+    def __len__(self):
+        return self.array.shape[0]
+
+    def __getitem__(self, index):
+        """Returns a VectorView for an integer index, a VectorBatch viewing
+        the mapped rows for a slice"""
+
+        if isinstance(index, Integral):
+            return VectorView(self.array[index])
+        return VectorBatch(self.array[index])
+
+    def __setitem__(self, index, value):
+        if isinstance(value, VectorBatch):
+            value = value.coordinates
+        elif isinstance(value, Vector):
+            value = [float(x) for x in value.coordinates]
+        self.array[index] = value
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield VectorView(self.array[i])
+
+    def iter_chunks(self, chunk_size=65536):
+        """Yields VectorBatch views of consecutive rows """
+
+        for start in range(0, len(self), chunk_size):
+            yield VectorBatch(self.array[start:start + chunk_size])
+
+    def flush(self):
+        self.array.flush()
+
+
+def save_vectors(path, vectors, precision=None, backend=None):
+    """Saves a VectorBatch, an N x d array or a list of Vectors as a store
+    and returns it opened read only.
+
+    precision and backend are recorded as metadata, defaulting to those of
+    the first Vector when a list of Vectors is given."""
+
+    if isinstance(vectors, VectorBatch):
+        array = vectors.coordinates
+    elif isinstance(vectors, np.ndarray):
+        array = vectors
+    else:
+        vectors = list(vectors)
+        if vectors and isinstance(vectors[0], Vector):
+            first_backend = vectors[0].backend
+            backend = backend or first_backend.name
+            precision = precision or getattr(first_backend, 'prec', None)
+        array = np.array([v.coordinates for v in vectors], dtype=np.float64)
+
+    array = np.asarray(array, dtype=np.float64)
+    if array.ndim != 2:
+        raise ValueError('The vectors must form an N x d array')
+
+    path = _npy_path(path)
+    np.save(path, array)
+    _write_metadata(path, array.shape[0], array.shape[1], precision, backend)
+    return VectorStore(path)
+
+
+def _npy_path(path):
+    if not path.endswith('.npy'):
+        path += '.npy'
+    return path
+
+
+def _metadata_path(npy_path):
+    return npy_path[:-len('.npy')] + '.json'
+
+
+def _write_metadata(path, count, dimension, precision, backend):
+    metadata = {
+        'format_version': FORMAT_VERSION,
+        'count': int(count),
+        'dimension': int(dimension),
+        'precision': precision,
+        'backend': getattr(backend, 'name', backend),
+    }
+    with open(_metadata_path(path), 'w') as f:
+        json.dump(metadata, f, indent=2, sort_keys=True)
+
+
+def _read_metadata(path):
+    try:
+        with open(_metadata_path(path)) as f:
+            return json.load(f)
+    except IOError:
+        return {}
@@ -0,0 +1,126 @@
+from itertools import islice
+
+import numpy as np
+
+from numeric_backends import get_backend
+from vector_batch import VectorBatch, vector_from_floats
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def read_csv_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, delimiter=',',
+                    skip_header=0):
+    """Yields VectorBatch chunks of at most chunk_size rows from a text file
+    with one vector per line and coordinates separated by delimiter.
+
+    Only one chunk is held in memory at a time. skip_header lines at the
+    top of the file are ignored, as are blank lines and lines starting
+    with '#'."""
+
+    with open(path) as f:
+        for _ in range(skip_header):
+            next(f, None)
+        for rows in _chunks_of_rows(f, chunk_size, delimiter):
+            yield VectorBatch(rows)
+
+
+def read_text_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, skip_header=0):
+    """Yields VectorBatch chunks from a text file with whitespace separated
+    coordinates, one vector per line"""
+
+    return read_csv_chunks(path, chunk_size, delimiter=None,
+                           skip_header=skip_header)
+
+
+def read_binary_chunks(path, dimension, chunk_size=DEFAULT_CHUNK_SIZE, offset=0):
+    """Yields VectorBatch chunks from a raw dump of little-endian float64
+    values, dimension values per vector, starting offset bytes in"""
+
+    values_per_chunk = chunk_size * dimension
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while True:
+            values = np.fromfile(f, dtype='<f8', count=values_per_chunk)
+            if not len(values):
+                break
+            if len(values) % dimension:
+                raise ValueError('{} ends with a partial vector of {} values'.format(
+                    path, len(values) % dimension))
+            yield VectorBatch(values.reshape(-1, dimension))
+
+
+def write_binary_chunks(path, chunks):
+    """Writes a stream of VectorBatch chunks (or N x d arrays) as raw
+    little-endian float64 values and returns the number of vectors written"""
+
+    count = 0
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            array = chunk.coordinates if isinstance(chunk, VectorBatch) else chunk
+            np.asarray(array, dtype='<f8').tofile(f)
+            count += len(array)
+    return count
+
+
+def rechunk(vectors, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Groups an iterable of Vector objects into VectorBatch chunks """
+
+    iterator = iter(vectors)
+    while True:
+        rows = [v.coordinates for v in islice(iterator, chunk_size)]
+        if not rows:
+            break
+        yield VectorBatch(np.array(rows, dtype=np.float64))
+
+
+def iter_vectors(chunks, backend=None):
+    """Yields one Vector per row of a stream of VectorBatch chunks, built
+    as VectorBatch.to_vectors builds them"""
+
+    backend = get_backend(backend)
+    for chunk in chunks:
+        for row in chunk.coordinates.tolist():
+            yield vector_from_floats(row, backend)
+
+
+def map_dot_product(chunks, v):
+    """Yields the dot products of every chunk's rows with v, one array per
+    chunk"""
+
+    for chunk in chunks:
+        yield chunk.find_dot_product(v)
+
+
+def map_magnitude(chunks):
+    """Yields the magnitudes of every chunk's rows, one array per chunk """
+
+    for chunk in chunks:
+        yield chunk.find_magnitude()
+
+
+def map_normalize(chunks):
+    """Yields every chunk normalized to unit vectors """
+
+    for chunk in chunks:
+        yield chunk.find_normalization_vector()
+
+
+def map_cross_product(chunks, v):
+    """Yields the cross products of every chunk's rows with v """
+
+    for chunk in chunks:
+        yield chunk.find_cross_product_of(v)
+
+
+def _chunks_of_rows(lines, chunk_size, delimiter):
+    rows = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        rows.append([float(x) for x in line.split(delimiter)])
+        if len(rows) == chunk_size:
+            yield np.array(rows, dtype=np.float64)
+            rows = []
+    if rows:
+        yield np.array(rows, dtype=np.float64)
@@ -1,8 +1,8 @@
 from math import sqrt, acos, pi, cos, degrees
-from decimal import Decimal, getcontext
+from decimal import Decimal, localcontext
 
-# sets precision lenght for decimal objects
-getcontext().prec = 7
+# precision lenght for decimal objects, set only while main() runs
+PRECISION = 7
 
 class Vector(object):
     """Creates template and methods for vector objects """
@@ -206,4 +206,6 @@ def main():
     print triangle_area
 
 if __name__ == '__main__':
-    main()
+    with localcontext() as context:
+        context.prec = PRECISION
+        main()
@@ -1,20 +1,41 @@
 from math import sqrt, acos, pi, cos, degrees
-from decimal import Decimal, getcontext
+from decimal import Decimal, InvalidOperation
 
-# sets precision lenght for decimal objects
-getcontext().prec = 7
+from canonical import quantize
+from numeric_backends import get_backend, in_backend_context
+import predicates
 
 class Vector(object):
-    """Creates template and methods for vector objects """
+    """Creates template and methods for vector objects.
+
+    Coordinates are stored as numbers of a numeric backend ('float',
+    'decimal' or 'fraction', see numeric_backends). The backend is taken
+    from the backend argument, else from the enclosing use_backend() or
+    precision() scope, and defaults to Decimal with 7 digits. Arithmetic
+    runs at the backend's own precision, not the global decimal context.
+    Vectors built by a method keep the backend of the vector the method
+    was called on.
+
+    Vectors are immutable, so the magnitude, unit vector and zero flag are
+    computed the first time they are asked for and then cached."""
+
+    __slots__ = ('coordinates', 'dimension', 'backend',
+                 '_squared_magnitude', '_magnitude', '_normalized', '_is_zero',
+                 '_hash')
 
     CANNOT_NORMALIZE_ZERO_VECTOR_MSG = "Cannot normalize the zero vector"
+    NO_UNIQUE_PARALLEL_COMPONENT_MSG = "No unique parallel component"
+    NO_UNIQUE_ORTHOGONAL_COMPONENT_MSG = "No unique orthogonal component"
 
-    def __init__(self, coordinates):
+    def __init__(self, coordinates, backend=None):
+        backend = get_backend(backend)
         try:
             if not coordinates:
                 raise ValueError
-            self.coordinates = tuple([Decimal(x) for x in coordinates])
-            self.dimension = len(coordinates)
+            convert = backend.convert
+            _set(self, 'coordinates', tuple([convert(x) for x in coordinates]))
+            _set(self, 'dimension', len(coordinates))
+            _set(self, 'backend', backend)
 
         except ValueError:
             raise ValueError('The coordinates must be nonempty')
@@ -22,6 +43,37 @@ class Vector(object):
         except TypeError:
             raise TypeError('The coordinates must be an iterable')
 
+        _clear_cache(self)
+
+    @classmethod
+    def _from_backend_values(cls, coordinates, backend):
+        """Builds a vector from numbers already in backend, skipping the
+        conversion done by __init__"""
+
+        vector = cls.__new__(cls)
+        _set(vector, 'coordinates', tuple(coordinates))
+        _set(vector, 'dimension', len(vector.coordinates))
+        _set(vector, 'backend', backend)
+        _clear_cache(vector)
+        return vector
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Vector objects are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Vector objects are immutable')
+
+    def __reduce__(self):
+        return (_rebuild_vector, (self.coordinates, self.backend))
+
+    def _coordinates_of(self, v):
+        """Returns v's coordinates converted to this vector's backend """
+
+        if v.backend is self.backend:
+            return v.coordinates
+        convert = self.backend.convert
+        return [convert(x) for x in v.coordinates]
+
     def __str__(self):
         """prints Vector coordinates as string """
 
@@ -32,102 +84,162 @@ class Vector(object):
 
         return self.coordinates == v.coordinates
 
+    def __ne__(self, v):
+        return not self == v
+
+    def __hash__(self):
+        """Hashes the coordinates snapped to the is_zero tolerance grid, so
+        equal vectors of any backend hash alike. Computed once"""
+
+        value = self._hash
+        if value is None:
+            value = hash(quantize(self.coordinates))
+            _set(self, '_hash', value)
+        return value
+
+    def __len__(self):
+        return self.dimension
+
+    def __iter__(self):
+        return iter(self.coordinates)
+
+    def __getitem__(self, index):
+        return self.coordinates[index]
+
+    @in_backend_context
     def plus(self, v):
         """Adds a vector's coordinates with another vector """
 
-        new_coordinates = [x+y for x,y in zip(self.coordinates, v.coordinates)]
-        return Vector(new_coordinates)
+        new_coordinates = [x+y for x,y in zip(self.coordinates, self._coordinates_of(v))]
+        return Vector._from_backend_values(new_coordinates, self.backend)
 
+    @in_backend_context
     def minus(self, v):
         """Subtracts a vector's coordinates with another vector """
 
-        new_coordinates = [x-y for x,y in zip(self.coordinates, v.coordinates)]
-        return Vector(new_coordinates)
+        new_coordinates = [x-y for x,y in zip(self.coordinates, self._coordinates_of(v))]
+        return Vector._from_backend_values(new_coordinates, self.backend)
 
+    @in_backend_context
     def multiply(self,v):
         """Multiplies a vector's coordinates with another vector """
 
-        multiplied_coordinates = [x*y for x,y in zip(self.coordinates, v.coordinates)]
-        return Vector(multiplied_coordinates)
+        multiplied_coordinates = [x*y for x,y in zip(self.coordinates, self._coordinates_of(v))]
+        return Vector._from_backend_values(multiplied_coordinates, self.backend)
 
+    @in_backend_context
     def times_scalar(self, c):
         """Multiplies vector coordinates by a given scalar unit """
 
-        new_coordinates = [Decimal(x) * c for x in self.coordinates]
-        return Vector(new_coordinates)
-
-    def find_magnitude(self):
-        """Calcuates magnitude/length of Vector """
+        c = self.backend.convert(c)
+        new_coordinates = [x * c for x in self.coordinates]
+        return Vector._from_backend_values(new_coordinates, self.backend)
 
-        coordinates_squared = [i**2 for i in self.coordinates]
-        magnitude = sqrt(sum(coordinates_squared))
-        return Decimal(magnitude)
+    @in_backend_context
+    def find_squared_magnitude(self):
+        """Calculates the squared magnitude of Vector, cached after the first call """
 
-    def find_normalization_vector(self):
-        """Returns coordinates of normalized vector unit """
+        squared = self._squared_magnitude
+        if squared is None:
+            squared = sum([i*i for i in self.coordinates])
+            _set(self, '_squared_magnitude', squared)
+        return squared
 
-        new_coordinates = []
-        try:
-            for value in self.coordinates:
-                new_coordinates.append(Decimal(value)/self.find_magnitude())
-        except ZeroDivisionError:
-            raise Exception("Cannot normalize zero vector")
+    @in_backend_context
+    def find_magnitude(self):
+        """Calcuates magnitude/length of Vector, cached after the first call """
 
-        return Vector(new_coordinates)
+        magnitude = self._magnitude
+        if magnitude is None:
+            magnitude = self.backend.sqrt(self.find_squared_magnitude())
+            _set(self, '_magnitude', magnitude)
+        return magnitude
 
+    @in_backend_context
+    def find_normalization_vector(self):
+        """Returns coordinates of normalized vector unit, cached after the
+        first call """
+
+        normalized = self._normalized
+        if normalized is None:
+            magnitude = self.find_magnitude()
+            try:
+                normalized = Vector._from_backend_values(
+                    [value/magnitude for value in self.coordinates], self.backend)
+            except (ZeroDivisionError, InvalidOperation):
+                raise Exception(self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG)
+            _set(self, '_normalized', normalized)
+        return normalized
+
+    @in_backend_context
     def find_dot_product(self, v):
         """Calcuates dot product of a vector with another vector"""
 
-        products = [x*y for x,y in zip(self.coordinates, v.coordinates)]
+        products = [x*y for x,y in zip(self.coordinates, self._coordinates_of(v))]
         return sum(products)
 
+    @in_backend_context
     def find_vectors_angle(self,v, in_degrees=False):
         """Returns an angle between two vectors in radian or degree units"""
 
+        # one square root of |v1|^2 |v2|^2 rather than two magnitudes, so an
+        # exact backend gives a ratio of exactly +-1 for parallel vectors
+        squares = self.find_squared_magnitude() * self.backend.convert(v.find_squared_magnitude())
+
         try:
-            mag1 = self.find_magnitude()
-            mag2 = v.find_magnitude()
+            ratio = self.find_dot_product(v)/self.backend.sqrt(squares)
 
-        except ZeroDivisionError:
+        except (ZeroDivisionError, InvalidOperation):
             raise Exception("Cannot calculate angle with zero vector")
 
-        ratio = Decimal(self.find_dot_product(v)/Decimal(mag1*mag2))
         if ratio < -1:
             ratio = -1
         elif ratio > 1:
             ratio = 1
-        angle_in_radians = Decimal(acos(ratio))
+        angle_in_radians = self.backend.acos(ratio)
 
         if in_degrees:
-            return degree(angle_in_radians)
+            return self.backend.convert(degrees(angle_in_radians))
         else:
             return angle_in_radians
 
     def is_orthogonal_to(self,v, tolerance=1e-10):
-        """Returns boolean if a vector is orthogonal to another vector"""
+        """Returns boolean if a vector is orthogonal to another vector.
+        Exact, ignoring tolerance, inside predicates.use_exact_predicates()"""
 
+        if predicates.exact_predicates_enabled():
+            return predicates.is_orthogonal(self, v)
         return abs(self.find_dot_product(v)) < tolerance
 
     def is_parallel_to(self,v):
-        """Returns boolean if a vector is parallel to another vector"""
+        """Returns boolean if a vector is parallel to another vector.
+        Exact inside predicates.use_exact_predicates()"""
+
+        if predicates.exact_predicates_enabled():
+            return predicates.is_parallel(self, v)
 
         if self.is_zero() or v.is_zero():
             return True
-        elif self.find_vectors_angle(v) == 0:
-            return True
-        elif self.find_vectors_angle(v) == pi:
-            return True
-        else:
-            return False
+
+        angle = self.find_vectors_angle(v)
+        return angle == 0 or angle == pi
 
     def is_zero(self, tolerance=1e-10):
-        """Return boolean for zero precision """
+        """Return boolean for zero precision, cached for the default tolerance """
 
-        return self.find_magnitude() < tolerance
+        if tolerance != 1e-10:
+            return self.find_magnitude() < tolerance
+
+        is_zero = self._is_zero
+        if is_zero is None:
+            is_zero = self.find_magnitude() < tolerance
+            _set(self, '_is_zero', is_zero)
+        return is_zero
 
     def find_v_parallel_to(self, basis):
         """Returns vector coordinates of vector parallel
-        against basis vector"""
+        against basis vector. The basis's unit vector is cached on the
+        basis, so projecting many vectors onto one basis normalizes it once"""
 
         try:
             norm_b = basis.find_normalization_vector()
@@ -149,26 +261,27 @@ class Vector(object):
             return self.minus(projection)
 
         except Exception as e:
-            if str(e) == self.CANNOT_NORMALIZE_ZERO_VECTOR_MSG:
+            if str(e) == self.NO_UNIQUE_PARALLEL_COMPONENT_MSG:
                 raise Exception(self.NO_UNIQUE_ORTHOGONAL_COMPONENT_MSG)
             else:
                 raise e
 
+    @in_backend_context
     def find_cross_product_of(self, v):
         """Calculates cross product coordinates of 2-d or 3d vectors """
 
         if self.dimension == 2 and v.dimension == 2:
             y0,y1 = self.coordinates
-            z0,z1 = v.coordinates
-            return Vector([0.,0., (y0*z1 - y1*z0)])
+            z0,z1 = self._coordinates_of(v)
+            return Vector([0,0, (y0*z1 - y1*z0)], self.backend)
 
         if self.dimension == 3 and v.dimension == 3:
-            y0, y1, y2 = [Decimal(x) for x in self.coordinates]
-            z0, z1, z2 = [Decimal(x) for x in v.coordinates]
-            return Vector([(y1*z2) - (y2*z1),
-                          -((y0*z2) -(y2*z0)),
-                            (y0*z1)- (y1*z0)
-                          ])
+            y0, y1, y2 = self.coordinates
+            z0, z1, z2 = self._coordinates_of(v)
+            return Vector._from_backend_values([(y1*z2) - (y2*z1),
+                                               -((y0*z2) -(y2*z0)),
+                                                 (y0*z1)- (y1*z0)
+                                               ], self.backend)
 
     def find_parallogram_area_of(self, vector2):
         """Calculates parallelogram area from two vectors """
@@ -176,9 +289,27 @@ class Vector(object):
         cross_product_vector = self.find_cross_product_of(vector2)
         return cross_product_vector.find_magnitude()
 
+    @in_backend_context
     def find_triangle_area_of(self, vector2):
         """Calculates right triangle area of parallelogram from two vectors """
-        return self.find_parallogram_area_of(vector2) / Decimal('2')
+        return self.find_parallogram_area_of(vector2) / self.backend.convert(2)
+
+_set = object.__setattr__
+
+
+def _rebuild_vector(coordinates, backend):
+    """Unpickles a Vector without going through __setattr__ """
+
+    return Vector._from_backend_values(coordinates, backend)
+
+
+def _clear_cache(vector):
+    _set(vector, '_squared_magnitude', None)
+    _set(vector, '_magnitude', None)
+    _set(vector, '_normalized', None)
+    _set(vector, '_is_zero', None)
+    _set(vector, '_hash', None)
+
 
 def main():
     """ quiz for coding cross products"""
@@ -1,7 +1,8 @@
 from math import sqrt, acos, pi, cos, degrees
-from decimal import Decimal, getcontext
+from decimal import Decimal, localcontext
 
-getcontext().prec = 30
+# precision lenght for decimal objects, set only while main() runs
+PRECISION = 30
 
 class Vector(object):
     CANNOT_NORMALIZE_ZERO_VECTOR_MSG = "Cannot normalize the zero vector"
@@ -128,4 +129,6 @@ def main():
     print v7.is_parallel_to(v8)
 
 if __name__ == '__main__':
-    main()
+    with localcontext() as context:
+        context.prec = PRECISION
+        main()
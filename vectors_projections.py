@@ -1,8 +1,8 @@
 from math import sqrt, acos, pi, cos, degrees
-from decimal import Decimal, getcontext
+from decimal import Decimal, localcontext
 
-# sets precision lenght for decimal objects
-getcontext().prec = 6
+# precision lenght for decimal objects, set only while main() runs
+PRECISION = 6
 
 class Vector(object):
     CANNOT_NORMALIZE_ZERO_VECTOR_MSG = "Cannot normalize the zero vector"
@@ -158,4 +158,6 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    with localcontext() as context:
+        context.prec = PRECISION
+        main()